@@ -0,0 +1,28 @@
+"""Composite index for per-project application ranking
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /api/hr/applications/{project_id} filters by project and orders by score
+    op.create_index(
+        'ix_applications_project_score',
+        'applications',
+        ['project_id', 'score'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_project_score', table_name='applications')
@@ -0,0 +1,25 @@
+"""Precomputed team embedding
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Weighted member-embedding average; NULL until first computed
+    op.add_column('teams', sa.Column('embedding', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('teams', 'embedding')
@@ -0,0 +1,39 @@
+"""Lowercase stored skills
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _lowercase(table: str, key: str, column: str) -> None:
+    t = sa.table(table, sa.column(key, sa.Integer), sa.column(column, sa.JSON))
+    conn = op.get_bind()
+    for row_id, skills in conn.execute(sa.select(t.c[key], t.c[column])).all():
+        if not skills:
+            continue
+        lowered = [s.strip().lower() for s in skills]
+        if lowered != skills:
+            conn.execute(t.update().where(t.c[key] == row_id).values({column: lowered}))
+
+
+def upgrade() -> None:
+    # The ORM now lowercases skills on write (models.normalize_skills);
+    # bring existing rows in line so matching can compare them directly
+    _lowercase('employees', 'id', 'skills')
+    _lowercase('projects', 'id', 'required_skills')
+
+
+def downgrade() -> None:
+    # Original casing is not recoverable; lowercase skills remain valid
+    pass
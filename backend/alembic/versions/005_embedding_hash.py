@@ -0,0 +1,27 @@
+"""Embedding content hash
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Hash of the last embedded text; NULL means "embed on next reindex"
+    op.add_column('employees', sa.Column('embedding_hash', sa.String(length=64), nullable=True))
+    op.add_column('projects', sa.Column('embedding_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'embedding_hash')
+    op.drop_column('employees', 'embedding_hash')
@@ -2,39 +2,71 @@
 admin_tools.py - Utilities for HR DB management.
 """
 import os
-import shutil
+import sqlite3
 
-HR_DB_DIR = os.path.dirname(os.path.abspath(__file__))
+# Tenant DBs live next to klh.db in backend/ (see app.database._BASE_DIR)
+HR_DB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 def list_hr_dbs():
-    """List all HR database files."""
-    return [f for f in os.listdir(HR_DB_DIR) if f.startswith("hr_") and f.endswith(".db")]
+    """
+    List all HR database files as (filename, size_in_bytes) tuples.
+    A single scandir pass yields names and sizes without a stat per file.
+    """
+    with os.scandir(HR_DB_DIR) as entries:
+        return [
+            (e.name, e.stat().st_size)
+            for e in entries
+            if e.name.startswith("hr_") and e.name.endswith(".db") and e.is_file()
+        ]
 
 
 def backup_hr_db(hr_id, backup_dir):
     """Backup a specific HR DB to the given directory."""
-    db_path = os.path.join(HR_DB_DIR, f"hr_{hr_id}.db")
+    from app.database import hr_db_path
+
+    db_path = hr_db_path(hr_id)
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"No DB for HR ID {hr_id}")
     os.makedirs(backup_dir, exist_ok=True)
     backup_path = os.path.join(backup_dir, f"hr_{hr_id}.db.bak")
-    shutil.copy2(db_path, backup_path)
+    # Tenant DBs run in WAL mode, so recent commits may still live in the
+    # -wal file; the SQLite backup API copies a consistent snapshot.
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(backup_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
     return backup_path
 
 
 def delete_hr_db(hr_id):
     """Delete a specific HR DB."""
-    db_path = os.path.join(HR_DB_DIR, f"hr_{hr_id}.db")
+    from app.auth import invalidate_tenant_principals
+    from app.database import dispose_hr_db, hr_db_path, unregister_hr_id
+
+    db_path = hr_db_path(hr_id)
+    # Release pooled connections first so the deleted file isn't held open
+    dispose_hr_db(hr_id)
+    unregister_hr_id(hr_id)
+    invalidate_tenant_principals(hr_id)
     if os.path.exists(db_path):
         os.remove(db_path)
+        # WAL-mode side files
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
         return True
     return False
 
 
 def get_hr_db_size(hr_id):
     """Get the size of a specific HR DB in bytes."""
-    db_path = os.path.join(HR_DB_DIR, f"hr_{hr_id}.db")
+    from app.database import hr_db_path
+
+    db_path = hr_db_path(hr_id)
     if os.path.exists(db_path):
         return os.path.getsize(db_path)
     return 0
@@ -3,13 +3,18 @@ auth.py - JWT creation, verification, and FastAPI dependency for current user.
 """
 
 import os
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+import anyio
 import bcrypt as _bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
@@ -20,6 +25,7 @@ from app.config import settings
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+BCRYPT_ROUNDS = settings.bcrypt_rounds
 
 # ── OAuth2 scheme (Bearer token in Authorization header) ──────────────────────
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/employee/login")
@@ -29,9 +35,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/employee/login")
 # Password utilities
 # ─────────────────────────────────────────────────────────────
 
-def hash_password(plain: str) -> str:
-    """Return bcrypt hash of a plaintext password."""
-    return _bcrypt.hashpw(plain.encode(), _bcrypt.gensalt()).decode()
+def hash_password(plain: str, rounds: Optional[int] = None) -> str:
+    """Return bcrypt hash of a plaintext password (BCRYPT_ROUNDS unless `rounds` is given)."""
+    return _bcrypt.hashpw(plain.encode(), _bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)).decode()
 
 
 def verify_password(plain: str, hashed: str) -> bool:
@@ -39,6 +45,32 @@ def verify_password(plain: str, hashed: str) -> bool:
     return _bcrypt.checkpw(plain.encode(), hashed.encode())
 
 
+# bcrypt is pure CPU work; bound concurrent hashes by core count rather than
+# by the (much larger) shared threadpool so a login burst can't starve it.
+_bcrypt_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def _get_bcrypt_limiter() -> anyio.CapacityLimiter:
+    global _bcrypt_limiter
+    if _bcrypt_limiter is None:
+        _bcrypt_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+    return _bcrypt_limiter
+
+
+async def hash_password_async(plain: str) -> str:
+    """hash_password off the event loop, for use inside async handlers."""
+    return await anyio.to_thread.run_sync(
+        hash_password, plain, limiter=_get_bcrypt_limiter()
+    )
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password off the event loop, for use inside async handlers."""
+    return await anyio.to_thread.run_sync(
+        verify_password, plain, hashed, limiter=_get_bcrypt_limiter()
+    )
+
+
 # ─────────────────────────────────────────────────────────────
 # Token handling
 # ─────────────────────────────────────────────────────────────
@@ -56,6 +88,37 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# Verified-token cache: every authenticated request decodes the same bearer
+# token more than once (get_db_for_hr + get_current_employee), so keep the
+# verified claims until the token's own `exp`. Failed decodes are never cached.
+_TOKEN_CACHE_MAX_SIZE = 10_000
+_token_cache: dict = {}
+_token_cache_lock = threading.Lock()
+
+
+def decode_jwt(token: str) -> dict:
+    """
+    Verify a JWT's signature/expiry and return its claims, memoised per token.
+    Raises JWTError exactly like jwt.decode on invalid or expired tokens.
+    """
+    now = time.time()
+    with _token_cache_lock:
+        payload = _token_cache.get(token)
+        if payload is not None:
+            if payload.get("exp", 0) > now:
+                return payload
+            del _token_cache[token]
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if "exp" in payload:
+        with _token_cache_lock:
+            # Evict the oldest entry (dicts keep insertion order)
+            if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+                _token_cache.pop(next(iter(_token_cache)))
+            _token_cache[token] = payload
+    return payload
+
+
 def decode_token(token: str) -> dict:
     """Decode and validate a JWT. Raises HTTPException on any failure."""
     credentials_exception = HTTPException(
@@ -64,7 +127,7 @@ def decode_token(token: str) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_jwt(token)
         email: Optional[str] = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -90,12 +153,77 @@ def get_current_employee(
     return employee
 
 
+# Principal cache for role guards: require_role only needs id/email/role, which
+# effectively never change, so keep them for a short TTL keyed by (hr_id, sub)
+# instead of re-selecting the employee row on every guarded request. Handlers
+# that need the full ORM row still use get_current_employee.
+# Every path that changes a role or membership must drop the affected entries:
+# invalidate_principal for one employee, invalidate_tenant_principals when a
+# whole tenant DB goes away (admin_tools.delete_hr_db). Otherwise the change
+# (including losing access) only reaches role-guarded routes once the entry
+# expires, up to 30 s later.
+_PRINCIPAL_CACHE_TTL = 30.0
+_PRINCIPAL_CACHE_MAX_SIZE = 5_000
+_principal_cache: dict = {}
+_principal_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Detached snapshot of the authenticated employee returned by role guards."""
+    id: int
+    email: str
+    role: str
+
+
+def invalidate_principal(email: str) -> None:
+    """Drop cached principals for an employee across all HR tenants."""
+    with _principal_cache_lock:
+        for key in [k for k in _principal_cache if k[1] == email]:
+            del _principal_cache[key]
+
+
+def invalidate_tenant_principals(hr_id: str) -> None:
+    """Drop every cached principal belonging to an HR tenant."""
+    with _principal_cache_lock:
+        for key in [k for k in _principal_cache if k[0] == hr_id]:
+            del _principal_cache[key]
+
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db_for_hr),
+) -> AuthenticatedUser:
+    """Dependency: like get_current_employee, but served from a short TTL cache."""
+    payload = decode_token(token)
+    key = (payload.get("hr_id"), payload.get("sub"))
+    now = time.monotonic()
+    with _principal_cache_lock:
+        entry = _principal_cache.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                return entry[0]
+            del _principal_cache[key]
+
+    employee = get_current_employee(token, db)
+    principal = AuthenticatedUser(id=employee.id, email=employee.email, role=employee.role)
+    with _principal_cache_lock:
+        if len(_principal_cache) >= _PRINCIPAL_CACHE_MAX_SIZE:
+            _principal_cache.pop(next(iter(_principal_cache)))
+        _principal_cache[key] = (principal, now + _PRINCIPAL_CACHE_TTL)
+    return principal
+
+
 def require_role(*roles: str):
     """
     Factory for role-guard dependencies.
     Usage: Depends(require_role("hr")) or Depends(require_role("team_lead", "hr"))
+    Returns an AuthenticatedUser, not an ORM row. The role is read from the
+    principal cache, so role changes and deletions made without
+    invalidate_principal / invalidate_tenant_principals apply after up to
+    _PRINCIPAL_CACHE_TTL (30 s).
     """
-    def _checker(current_user: models.Employee = Depends(get_current_employee)):
+    def _checker(current_user: AuthenticatedUser = Depends(get_current_principal)):
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
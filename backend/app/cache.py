@@ -1,6 +1,11 @@
 """
 cache.py - In-memory caching with TTL support.
 Can be swapped for Redis in production.
+
+The cache lives in each worker process. A write invalidates its keys only
+in the worker that handled it; with several workers (WEB_CONCURRENCY) the
+others keep serving their copy until it expires, so response caches that
+must reflect writes use TTLs of a few seconds.
 """
 
 import time
@@ -38,6 +43,8 @@ class TTLCache:
         self._cache: Dict[str, CacheEntry] = {}
         self._lock = asyncio.Lock()
         self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # Event loop the entries were written from (see invalidate_from_thread)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache. Returns None if expired or not found."""
@@ -59,6 +66,7 @@ class TTLCache:
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache with optional TTL override."""
+        self.loop = asyncio.get_running_loop()
         async with self._lock:
             # Evict oldest entries if max size reached
             while len(self._cache) >= self.max_size:
@@ -119,6 +127,32 @@ def cache_key(*args, **kwargs) -> str:
     return hashlib.md5(key_data.encode()).hexdigest()
 
 
+def tenant_cache_key(db, *parts) -> str:
+    """
+    Cache key scoped to the tenant database a Session is bound to, so cached
+    responses can never cross HR tenants.
+    """
+    return ":".join(["tenant", str(db.get_bind().url.database), *map(str, parts)])
+
+
+def invalidate_from_thread(*keys: str) -> None:
+    """
+    Delete cache keys from a sync (threadpool) handler, or from a plain
+    background thread such as the embedding queue worker. The latter has no
+    anyio portal, so the delete is submitted to the loop the cache was
+    filled from; if nothing was ever cached there is nothing to delete.
+    """
+    from anyio import from_thread
+
+    for key in keys:
+        try:
+            from_thread.run(cache.delete, key)
+        except RuntimeError:
+            loop = cache.loop
+            if loop is not None and loop.is_running():
+                asyncio.run_coroutine_threadsafe(cache.delete(key), loop).result(timeout=5)
+
+
 def cached(ttl: int = 300, key_prefix: str = ""):
     """
     Decorator for caching async function results.
@@ -32,12 +32,22 @@ class Settings(BaseSettings):
     db_pool_size: int = 5
     db_max_overflow: int = 10
     db_echo: bool = False
+    # Create missing tables/indexes at startup. Disable in production and run
+    # `alembic upgrade head` as a deploy step instead.
+    db_auto_create: bool = True
     
     # === Security ===
     secret_key: str = "klh_super_secret_key_change_in_production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
     refresh_token_expire_days: int = 7
+    # bcrypt work factor. Each +1 doubles hashing cost (12 ≈ 250 ms/hash);
+    # lowering it speeds up login/signup but weakens offline brute-force
+    # resistance, so never go below 10 outside local development.
+    bcrypt_rounds: int = 12
+    # Work factor for the demo accounts written by seed.py. Their passwords
+    # are public, so a low cost only makes logging in to them cheaper.
+    seed_bcrypt_rounds: int = 4
     
     # === CORS ===
     cors_origins: List[str] = [
@@ -67,8 +77,39 @@ class Settings(BaseSettings):
     
     # === AI/Embeddings ===
     embedding_model: str = "all-MiniLM-L6-v2"
+    # "torch" (default) or "onnx". ONNX Runtime is several times faster for
+    # these short texts on CPU; it needs sentence-transformers>=3.2 with the
+    # [onnx] extra and falls back to torch if unavailable. The file selects
+    # a pre-exported variant, e.g. "onnx/model_qint8_avx512.onnx" (int8).
+    embedding_backend: str = "torch"
+    embedding_onnx_file: Optional[str] = None
+    # Truncate encoder input to this many tokens (None = the model's own
+    # limit, 256 for MiniLM). Lower values encode long profiles faster.
+    embedding_max_seq_length: Optional[int] = None
+    # Threads per process for torch (encoding) and FAISS (OpenMP search).
+    # 0 = cpu_count // WEB_CONCURRENCY so that threads x workers <= cores.
+    compute_threads: int = 0
+    # Bulk reindexes (reindex_all, seed.py) encode on this many worker
+    # processes with one thread each; 0 or 1 encodes in-process.
+    embedding_processes: int = 0
     faiss_index_path: str = "faiss_employee.index"
     faiss_project_index_path: str = "faiss_project.index"
+    # Row storage for newly created indices: "fp16" (half the memory and
+    # bandwidth, ~1e-3 cosine error) or "fp32" (exact)
+    faiss_storage: str = "fp16"
+    # Candidate sets at least this large are narrowed with an IVF-PQ index
+    # before exact re-scoring; smaller ones are scored exactly.
+    faiss_ann_threshold: int = 10_000
+    faiss_ivf_nlist: int = 256
+    faiss_pq_m: int = 16  # sub-quantizers; must divide the 384-dim embedding
+    faiss_pq_nbits: int = 8
+    faiss_nprobe: int = 8
+    # "ivfpq" (compact, needs training) or "hnsw" (more memory, better recall
+    # at low latency, no training)
+    faiss_ann_kind: str = "ivfpq"
+    faiss_hnsw_m: int = 32
+    faiss_hnsw_ef_construction: int = 100
+    faiss_hnsw_ef_search: int = 64
     
     # === File Upload ===
     max_upload_size: int = 10 * 1024 * 1024  # 10 MB
@@ -3,15 +3,19 @@ database.py - Database connection and session management.
 Uses SQLite for local development; swap DATABASE_URL for PostgreSQL in production.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import StaticPool
+import logging
 import os
+import re
 import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger("klh")
+
 # Resolve DB path relative to this file's directory so it always points to
 # backend/klh.db regardless of which directory uvicorn is started from.
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # = backend/
@@ -22,12 +26,35 @@ DATABASE_URL = os.getenv("DATABASE_URL", _DEFAULT_DB)
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 poolclass_kwargs = {"poolclass": StaticPool} if DATABASE_URL.startswith("sqlite") else {}
 
+# Applied to every new SQLite connection: WAL lets readers proceed during a
+# write, synchronous=NORMAL drops the per-commit fsync (still crash-safe in
+# WAL mode), and the cache/mmap/temp settings keep hot pages in memory.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
     **poolclass_kwargs,
     echo=False,  # Set True to log SQL queries during development
 )
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -37,6 +64,36 @@ class Base(DeclarativeBase):
     pass
 
 
+def create_schema(bind) -> None:
+    """
+    Create any missing tables, then any nullable columns and indexes missing
+    from tables that already existed (create_all skips existing tables
+    wholesale, so columns and indexes added to the models later would
+    otherwise never reach older DB files).
+    """
+    Base.metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    for table in Base.metadata.tables.values():
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            try:
+                with bind.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                        f"{column.type.compile(dialect=bind.dialect)}"
+                    ))
+            except Exception as e:
+                logger.warning("Could not add column %s.%s: %s", table.name, column.name, e)
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            try:
+                index.create(bind=bind, checkfirst=True)
+            except Exception as e:
+                logger.warning("Could not create index %s: %s", index.name, e)
+
+
 def get_db():
     """
     FastAPI dependency: yields a DB session for the default (global) database.
@@ -49,6 +106,56 @@ def get_db():
         db.close()
 
 
+# ── HR tenant registry ───────────────────────────────────────
+# Tenant IDs end up in file paths, so only allow a conservative charset.
+_HR_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_hr_id(hr_id: str) -> bool:
+    return bool(hr_id) and _HR_ID_RE.match(hr_id) is not None
+
+
+def hr_db_path(hr_id: str) -> str:
+    """Absolute path of a tenant DB file. Raises ValueError on a malformed hr_id."""
+    if not is_valid_hr_id(hr_id):
+        raise ValueError(f"Invalid HR ID: {hr_id!r}")
+    return os.path.join(_BASE_DIR, f"hr_{hr_id}.db")
+
+
+def _scan_existing_hr_ids() -> set:
+    from app.admin_tools import list_hr_dbs
+    return {name[3:-3] for name, _ in list_hr_dbs()}
+
+
+# Known tenant IDs, so the per-request existence check is a set lookup rather
+# than a stat(). Misses still fall back to the filesystem once, which picks up
+# DBs created out-of-process (seed.py, restored backups).
+_EXISTING_HR: set = _scan_existing_hr_ids()
+_existing_hr_lock = threading.Lock()
+
+
+def register_hr_id(hr_id: str) -> None:
+    """Record that the tenant DB for hr_id now exists."""
+    with _existing_hr_lock:
+        _EXISTING_HR.add(hr_id)
+
+
+def unregister_hr_id(hr_id: str) -> None:
+    """Forget a tenant whose DB file has been removed."""
+    with _existing_hr_lock:
+        _EXISTING_HR.discard(hr_id)
+
+
+def hr_exists(hr_id: str) -> bool:
+    """True if a tenant DB exists for hr_id (False for malformed IDs)."""
+    if hr_id in _EXISTING_HR:
+        return True
+    if not is_valid_hr_id(hr_id) or not os.path.exists(hr_db_path(hr_id)):
+        return False
+    register_hr_id(hr_id)
+    return True
+
+
 # Utility to get a session for a specific HR ID
 # Engine cache: avoids creating a new engine (and opening new connections)
 # on every request for the same HR ID.
@@ -58,32 +165,48 @@ _hr_engine_lock = threading.Lock()
 
 def get_hr_db(hr_id: str):
     """Return a cached SessionMaker for the given HR tenant database."""
-    if hr_id not in _hr_engine_cache:
+    SessionHR = _hr_engine_cache.get(hr_id)
+    if SessionHR is None:
         with _hr_engine_lock:
             # Double-checked locking
-            if hr_id not in _hr_engine_cache:
-                hr_db_path = os.path.join(_BASE_DIR, f"hr_{hr_id}.db")
-                hr_db_url = f"sqlite:///{hr_db_path}"
-                # Use NullPool for file-based SQLite so each session gets a
-                # fresh connection instead of StaticPool reusing a stale one.
-                from sqlalchemy.pool import NullPool
+            SessionHR = _hr_engine_cache.get(hr_id)
+            if SessionHR is None:
+                hr_db_url = f"sqlite:///{hr_db_path(hr_id)}"
+                # File-based SQLite gets the default QueuePool so each tenant
+                # reuses a small set of open connections across requests.
                 hr_engine = create_engine(
                     hr_db_url,
                     connect_args={"check_same_thread": False},
-                    poolclass=NullPool,
                 )
-                # Ensure all tables exist in this tenant DB
-                Base.metadata.create_all(bind=hr_engine)
-                _hr_engine_cache[hr_id] = sessionmaker(
+                event.listen(hr_engine, "connect", _set_sqlite_pragmas)
+                # Ensure all tables and indexes exist in this tenant DB
+                create_schema(hr_engine)
+                SessionHR = sessionmaker(
                     autocommit=False, autoflush=False, bind=hr_engine
                 )
-    return _hr_engine_cache[hr_id]
+                _hr_engine_cache[hr_id] = SessionHR
+                register_hr_id(hr_id)
+    return SessionHR
+
+
+def dispose_hr_db(hr_id: str) -> bool:
+    """
+    Drop the cached engine for an HR tenant and close its pooled connections.
+    Call this whenever the tenant DB file is removed or replaced.
+    Returns True if an engine was cached for the tenant.
+    """
+    with _hr_engine_lock:
+        SessionHR = _hr_engine_cache.pop(hr_id, None)
+    if SessionHR is None:
+        return False
+    SessionHR.kw["bind"].dispose()
+    return True
 
 
 # FastAPI dependency to get DB session for HR ID from header
 from fastapi import Request, HTTPException, Depends
 from typing import Generator
-from jose import jwt, JWTError
+from jwt import InvalidTokenError as JWTError
 from app.config import settings
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
@@ -104,13 +227,17 @@ def get_db_for_hr(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from app.auth import decode_jwt
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_jwt(token)
         hr_id = payload.get("hr_id")
         if not hr_id:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    if not hr_exists(hr_id):
+        raise credentials_exception
     
     # Use the specific HR database for this tenant
     SessionHR = get_hr_db(hr_id)
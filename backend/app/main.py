@@ -6,11 +6,12 @@ Registers all routers, sets up CORS, middleware, and initialises the database on
 import logging
 from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
-from app.database import engine, Base
+from app.database import engine, create_schema
 from app.config import settings
 from app.routes import employee, team, project, hr, register
 from app.google_auth import router as google_auth_router
@@ -21,6 +22,8 @@ from app.middleware import (
 )
 from app.exceptions import setup_exception_handlers
 from app.cache import cache
+from app.services.embedding_queue import embedding_queue
+from app.services.embedding_service import warm_indices
 
 # ── Configure logging ─────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -38,13 +41,18 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Environment: {settings.environment}")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables initialized")
+    if settings.db_auto_create:
+        # Synchronous DDL; keep it off the event loop while the app boots
+        await anyio.to_thread.run_sync(create_schema, engine)
+        logger.info("Database tables initialized")
+    await anyio.to_thread.run_sync(warm_indices)
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    # Apply embeddings still waiting in the batch queue
+    await anyio.to_thread.run_sync(embedding_queue.stop, 10.0)
     await cache.clear()
     logger.info("Cache cleared")
 
@@ -4,12 +4,22 @@ models.py - SQLAlchemy ORM models for all database entities.
 
 from sqlalchemy import (
     Column, Integer, String, Float, ForeignKey,
-    DateTime, JSON, Boolean, func
+    DateTime, JSON, Boolean, Index, LargeBinary, func
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship, validates
 from app.database import Base
 
 
+def normalize_skills(skills):
+    """
+    Skills are stored lowercased and stripped, so matching compares them
+    directly instead of re-lowercasing on every scoring call.
+    """
+    if skills is None:
+        return None
+    return [s.strip().lower() for s in skills]
+
+
 class Team(Base):
     """Represents a team of employees working together on projects."""
     __tablename__ = "teams"
@@ -19,6 +29,11 @@ class Team(Base):
     team_code = Column(String, unique=True, nullable=True, index=True)  # custom join code set by team lead
     team_lead_id = Column(Integer, ForeignKey("employees.id"), nullable=True, index=True)
 
+    # Precomputed weighted team embedding (384 float16 values, see
+    # embedding_service.pack_team_embedding), refreshed when a member's vector
+    # changes; NULL means "compute from members on demand"
+    embedding = deferred(Column(LargeBinary, nullable=True))
+
     # Relationships
     members = relationship(
         "Employee",
@@ -53,7 +68,7 @@ class Employee(Base):
     email_verified = Column(Boolean, default=False)  # Email verification status
 
     # Stored as JSON arrays for SQLite/PostgreSQL compatibility
-    skills = Column(JSON, default=list)          # e.g. ["Python", "FastAPI"]
+    skills = Column(JSON, default=list)          # e.g. ["python", "fastapi"] (see normalize_skills)
     experience = Column(Float, default=0.0)       # years of experience
     projects = Column(JSON, default=list)         # past project titles
     certifications = Column(JSON, default=list)   # certification names
@@ -65,6 +80,8 @@ class Employee(Base):
 
     # FAISS vector index reference (row index in the FAISS index file)
     embedding_index = Column(Integer, nullable=True)
+    # SHA-256 of the text last embedded; unchanged rows are not re-embedded
+    embedding_hash = Column(String(64), nullable=True)
 
     # Relationships
     team = relationship(
@@ -73,6 +90,10 @@ class Employee(Base):
         foreign_keys=[team_id],
     )
 
+    @validates("skills")
+    def _normalize_skills(self, key, value):
+        return normalize_skills(value)
+
 
 class Project(Base):
     """Represents a project that teams can be matched to."""
@@ -81,14 +102,20 @@ class Project(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
-    required_skills = Column(JSON, default=list)      # e.g. ["React", "Node.js"]
+    required_skills = Column(JSON, default=list)      # e.g. ["react", "node.js"]
     required_experience = Column(Float, default=1.0)  # minimum years
 
     # Reference to FAISS index row for the project embedding
     embedding_reference = Column(Integer, nullable=True)
+    # SHA-256 of the text last embedded; unchanged rows are not re-embedded
+    embedding_hash = Column(String(64), nullable=True)
 
     applications = relationship("Application", back_populates="project")
 
+    @validates("required_skills")
+    def _normalize_required_skills(self, key, value):
+        return normalize_skills(value)
+
 
 class Application(Base):
     """
@@ -106,3 +133,10 @@ class Application(Base):
     # Relationships
     project = relationship("Project", back_populates="applications")
     team = relationship("Team", back_populates="applications")
+
+    __table_args__ = (
+        # One score row per (project, team); target of the evaluation upsert
+        Index("ix_applications_project_team", "project_id", "team_id", unique=True),
+        # Serves "applications for a project ordered by score" as an index range scan
+        Index("ix_applications_project_score", "project_id", "score"),
+    )
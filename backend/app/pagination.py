@@ -0,0 +1,59 @@
+"""
+pagination.py - Keyset (cursor) pagination for list endpoints.
+
+Pages are selected with `WHERE key > :cursor ORDER BY key LIMIT :limit`,
+which stays an index range scan however deep the page, unlike OFFSET.
+List endpoints keep returning a plain JSON array; when a page is full the
+cursor for the next one is sent in the X-Next-Cursor response header.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import Query
+from sqlalchemy import Select
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints."""
+
+    def __init__(
+        self,
+        cursor: int = Query(0, ge=0, description="Return rows with a key greater than this"),
+        limit: Optional[int] = Query(
+            None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit for the full list"
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+    @property
+    def is_full_list(self) -> bool:
+        return self.cursor == 0 and self.limit is None
+
+
+def keyset_page(stmt: Select, key, page: PageParams) -> Select:
+    """Restrict `stmt` to one page ordered by `key`, fetching one probe row extra."""
+    if page.cursor:
+        stmt = stmt.where(key > page.cursor)
+    stmt = stmt.order_by(key)
+    if page.limit is not None:
+        stmt = stmt.limit(page.limit + 1)
+    return stmt
+
+
+def split_page(
+    rows: Sequence[Any], page: PageParams, key_of: Callable[[Any], int]
+) -> Tuple[List[Any], Optional[int]]:
+    """Drop the probe row; return the page and the next cursor (None on the last page)."""
+    rows = list(rows)
+    if page.limit is None or len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, key_of(rows[-1])
+
+
+def cursor_headers(next_cursor: Optional[int]) -> dict:
+    return {NEXT_CURSOR_HEADER: str(next_cursor)} if next_cursor is not None else {}
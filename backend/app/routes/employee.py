@@ -3,30 +3,87 @@ routes/employee.py
 Handles signup, login, resume upload, and employee-facing project matches.
 """
 
-import io
+import asyncio
+import os
+import re
+from typing import BinaryIO
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, or_
 from sqlalchemy.orm import Session
 
 from app.database import get_db, get_db_for_hr
 from app import models, schemas
 from app.auth import (
-    hash_password, verify_password,
-    create_access_token, get_current_employee,
+    verify_password_async,
+    create_access_token, get_current_employee, invalidate_principal,
 )
-from app.services.embedding_service import update_employee_vector
+from app.services.embedding_queue import enqueue_employee_embedding
+from app.services.embedding_service import refresh_team_embeddings
+from app.services.skill_extractor import extract_skills
 from app.services.matching_service import get_top_5_projects_for_employee
 
 router = APIRouter(prefix="/api/employee", tags=["Employee"])
 
+# ── Resume parsing patterns (compiled once per process) ──
+_YEARS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:\+)?\s*(?:years?|yrs?)', re.IGNORECASE)
+_PROJECT_RE = re.compile(r'(?:project|worked on|developed|built)[^.\n]{5,60}', re.IGNORECASE)
+_CERT_RE = re.compile(r'(?:certified|certification|certificate)[^.\n]{3,60}', re.IGNORECASE)
+
+
+MAX_RESUME_SIZE = 20 * 1024 * 1024  # 20 MB
+
+
+def _extract_pdf_text(pdf_file: BinaryIO) -> str:
+    """
+    Extract plain text from a seekable PDF file object.
+    Uses PDFium (C++, much faster than pdfminer) when available and falls
+    back to pdfplumber for PDFs pypdfium2 can't open.
+    """
+    try:
+        import pypdfium2 as pdfium
+
+        pdf_file.seek(0)
+        pdf = pdfium.PdfDocument(pdf_file)
+        try:
+            return " ".join(page.get_textpage().get_text_range() for page in pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        import pdfplumber
+
+        pdf_file.seek(0)
+        with pdfplumber.open(pdf_file) as pdf:
+            return " ".join(page.extract_text() or "" for page in pdf.pages)
+
+
+# Handlers that only touch the (synchronous) SQLAlchemy session are plain
+# `def` so FastAPI runs them in its threadpool instead of blocking the event
+# loop on SQLite I/O. Async handlers offload their DB work explicitly.
+
 
 # ── Login ─────────────────────────────────────────────────────
+def _find_login_employee(db: Session, identifier: str):
+    """
+    Look up an employee by email, username or emp_id (blocking).
+    One OR query (SQLite resolves it as a MULTI-INDEX OR over the three unique
+    indexes); the CASE keeps the old email > username > emp_id precedence.
+    """
+    E = models.Employee
+    return (
+        db.query(E)
+        .filter(or_(E.email == identifier, E.username == identifier, E.emp_id == identifier))
+        .order_by(case((E.email == identifier, 0), (E.username == identifier, 1), else_=2))
+        .first()
+    )
+
+
 @router.post("/login", response_model=schemas.TokenResponse)
-def login(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
+async def login(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
     """Authenticate by email or username and return a JWT access token."""
     from app.security_log import log_failed_login
-    from app.database import get_hr_db
-    import os
-    from app.database import _BASE_DIR
+    from app.database import get_hr_db, hr_exists
     
     try:
         # Determine which DB to use
@@ -34,26 +91,21 @@ def login(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
         actual_hr_id = payload.hr_id
         
         if payload.hr_id and payload.hr_id != "default":
-            hr_db_path = os.path.join(_BASE_DIR, f"hr_{payload.hr_id}.db")
-            if os.path.exists(hr_db_path):
+            if hr_exists(payload.hr_id):
                 SessionHR = get_hr_db(payload.hr_id)
                 target_db = SessionHR()
             else:
                 log_failed_login(payload.email, f"HR ID {payload.hr_id} not found")
                 raise HTTPException(status_code=404, detail="HR ID not found")
         
-        employee = (
-            target_db.query(models.Employee).filter(models.Employee.email == payload.email).first()
-            or target_db.query(models.Employee).filter(models.Employee.username == payload.email).first()
-            or target_db.query(models.Employee).filter(models.Employee.emp_id == payload.email).first()
-        )
+        employee = await run_in_threadpool(_find_login_employee, target_db, payload.email)
         
         if not employee:
             if target_db != db: target_db.close()
             log_failed_login(payload.email, "User not found")
             raise HTTPException(status_code=401, detail="Invalid credentials")
             
-        if not verify_password(payload.password, employee.password_hash):
+        if not await verify_password_async(payload.password, employee.password_hash):
             if target_db != db: target_db.close()
             log_failed_login(payload.email, "Wrong password")
             raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -83,24 +135,26 @@ async def get_me(current: models.Employee = Depends(get_current_employee)):
 
 # ── Update profile ────────────────────────────────────────────
 @router.put("/me", response_model=schemas.EmployeeOut)
-async def update_me(
+def update_me(
     payload: schemas.EmployeeUpdate,
     db: Session = Depends(get_db_for_hr),
     current: models.Employee = Depends(get_current_employee),
 ):
     """Update the authenticated employee's profile fields."""
     update_data = payload.model_dump(exclude_unset=True)
+    old_team_id = current.team_id
     for field, value in update_data.items():
         setattr(current, field, value)
+    if current.team_id != old_team_id:
+        # A stored team vector aggregates its members: both teams change
+        db.flush()
+        refresh_team_embeddings({old_team_id, current.team_id} - {None}, db)
     db.commit()
     db.refresh(current)
+    invalidate_principal(current.email)
 
-    # Regenerate embedding when profile changes
-    try:
-        update_employee_vector(current.id, db)
-    except Exception as e:
-        import logging
-        logging.getLogger("klh").warning(f"Embedding update failed for employee {current.id}: {e}")
+    # Regenerate embedding (batched, off the request path)
+    enqueue_employee_embedding(current.id, db.get_bind())
 
     return current
 
@@ -113,69 +167,64 @@ async def upload_resume(
     current: models.Employee = Depends(get_current_employee),
 ):
     """
-    Accept a PDF resume, parse skills/experience via pdfplumber + spaCy,
-    update the employee record, and regenerate the FAISS embedding.
+    Accept a PDF resume, parse skills/experience via pypdfium2 + a skill-vocabulary scan,
+    update the employee record, and schedule a FAISS embedding refresh.
     """
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
-    contents = await file.read()
-
-    # Validate file size (max 20 MB)
-    MAX_RESUME_SIZE = 20 * 1024 * 1024
-    if len(contents) == 0:
+    # Starlette has already spooled the upload to a temp file (on disk past
+    # 1 MB); parse straight from it instead of copying it all into memory.
+    upload = file.file
+    upload.seek(0, os.SEEK_END)
+    size = upload.tell()
+    if size == 0:
         raise HTTPException(status_code=400, detail="Empty file")
-    if len(contents) > MAX_RESUME_SIZE:
+    if size > MAX_RESUME_SIZE:
         raise HTTPException(status_code=413, detail="File too large (max 20 MB)")
 
-    # ── Parse PDF ─────────────────────────────────────────────
     try:
-        import pdfplumber
-        import spacy
-        import re
+        current = await run_in_threadpool(_apply_resume, upload, current, db)
+    finally:
+        await file.close()
+
+    # Regenerate embedding (batched, off the request path)
+    enqueue_employee_embedding(current.id, db.get_bind())
+    return current
+
 
-        nlp = spacy.load("en_core_web_sm")
+def _merge_unique(existing, extracted, cap: int) -> list:
+    """Dedup existing + extracted keeping first-seen order, so stored values come first and stay stable."""
+    return list(dict.fromkeys((existing or []) + extracted))[:cap]
 
-        with pdfplumber.open(io.BytesIO(contents)) as pdf:
-            text = " ".join(page.extract_text() or "" for page in pdf.pages)
 
-        doc = nlp(text)
+def _apply_resume(upload: BinaryIO, current: models.Employee, db: Session) -> models.Employee:
+    """Parse the uploaded PDF and merge it into the employee record (blocking)."""
+    # ── Parse PDF ─────────────────────────────────────────────
+    try:
+        text = _extract_pdf_text(upload)
 
-        # ── Skills: noun/proper-noun tokens > 2 chars, title-cased or all-caps ──
-        extracted_skills = list({
-            token.text for token in doc
-            if token.pos_ in ("NOUN", "PROPN") and len(token.text) > 2
-        })[:30]
+        # ── Skills: keyword scan against the curated skill vocabulary ──
+        extracted_skills = extract_skills(text, limit=30)
 
         # ── Experience: look for patterns like "3 years", "2+ years" ──
-        years_pattern = re.findall(
-            r'(\d+(?:\.\d+)?)\s*(?:\+)?\s*(?:years?|yrs?)',
-            text,
-            re.IGNORECASE,
-        )
+        years_pattern = _YEARS_RE.findall(text)
         extracted_experience = max((float(y) for y in years_pattern), default=current.experience or 0.0)
 
         # ── Projects: lines that start with a bullet/dash or look like project titles ──
-        project_lines = re.findall(
-            r'(?:project|worked on|developed|built)[^.\n]{5,60}',
-            text,
-            re.IGNORECASE,
-        )
+        project_lines = _PROJECT_RE.findall(text)
         extracted_projects = [p.strip() for p in project_lines[:5]]
 
         # ── Certifications: common cert keywords ──
-        cert_lines = re.findall(
-            r'(?:certified|certification|certificate)[^.\n]{3,60}',
-            text,
-            re.IGNORECASE,
-        )
+        cert_lines = _CERT_RE.findall(text)
         extracted_certs = [c.strip() for c in cert_lines[:5]]
 
         # Merge extracted data with existing (preserve previously stored info)
-        current.skills = list(set((current.skills or []) + extracted_skills))[:40]
+        # Compare in stored (lowercased) form so re-uploads don't duplicate skills
+        current.skills = _merge_unique(current.skills, models.normalize_skills(extracted_skills), 40)
         current.experience = max(extracted_experience, current.experience or 0.0)
-        current.projects = list(set((current.projects or []) + extracted_projects))[:10]
-        current.certifications = list(set((current.certifications or []) + extracted_certs))[:10]
+        current.projects = _merge_unique(current.projects, extracted_projects, 10)
+        current.certifications = _merge_unique(current.certifications, extracted_certs, 10)
         current.resume_uploaded = True
 
     except Exception as e:
@@ -183,20 +232,12 @@ async def upload_resume(
 
     db.commit()
     db.refresh(current)
-
-    # Regenerate embedding after resume update
-    try:
-        update_employee_vector(current.id, db)
-    except Exception as e:
-        import logging
-        logging.getLogger("klh").warning(f"Embedding update failed after resume upload for employee {current.id}: {e}")
-
     return current
 
 
 # ── Top 5 projects ────────────────────────────────────────────
 @router.get("/top-projects")
-async def top_projects(
+def top_projects(
     db: Session = Depends(get_db_for_hr),
     current: models.Employee = Depends(get_current_employee),
 ):
@@ -210,6 +251,13 @@ async def update_embedding(
     db: Session = Depends(get_db_for_hr),
     current: models.Employee = Depends(get_current_employee),
 ):
-    """Force regeneration of the employee's FAISS embedding."""
-    idx = update_employee_vector(current.id, db)
+    """
+    Force regeneration of the employee's FAISS embedding.
+    The write goes through the embedding queue (coalescing with a refresh
+    already queued by a profile edit or resume upload); the request waits
+    for its batch without holding a worker thread.
+    """
+    idx = await asyncio.wrap_future(enqueue_employee_embedding(current.id, db.get_bind()))
+    if idx is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
     return {"message": "Embedding updated", "faiss_index": idx}
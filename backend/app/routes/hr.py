@@ -3,25 +3,32 @@ routes/hr.py
 HR-facing endpoints: evaluate all teams for a project, view ranked results.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
 from app.database import get_db_for_hr
 from app import models, schemas
-from app.auth import require_role
+from app.auth import AuthenticatedUser, require_role
 from app.services.matching_service import get_top_5_teams, rank_teams
 from app.services.team_service import get_team_skill_heatmap
 
 router = APIRouter(prefix="/api/hr", tags=["HR"])
 
+# All handlers here are synchronous (`def`) so FastAPI runs them in its
+# threadpool; they only do blocking SQLAlchemy/FAISS work.
+
+_application_list = TypeAdapter(List[schemas.ApplicationOut])
+
 
 # ── Evaluate all teams for a project ─────────────────────────
 @router.get("/rank-teams/{project_id}")
-async def rank_all_teams(
+def rank_all_teams(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """
     HR triggers evaluation of all teams for a project.
@@ -44,10 +51,10 @@ async def rank_all_teams(
 
 # ── Top 5 teams ───────────────────────────────────────────────
 @router.get("/top-teams/{project_id}")
-async def top_5_teams(
+def top_5_teams(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """Return the Top 5 ranked teams for a project."""
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -67,13 +74,17 @@ async def top_5_teams(
 
 # ── Team details with heatmap (HR view) ──────────────────────
 @router.get("/team-details/{team_id}", response_model=schemas.TeamDetailOut)
-async def team_details(
+def team_details(
     team_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """HR views full team details including members."""
-    team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
+    team = db.scalars(
+        select(models.Team)
+        .options(selectinload(models.Team.members))
+        .where(models.Team.team_id == team_id)
+    ).one_or_none()
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team
@@ -81,72 +92,82 @@ async def team_details(
 
 # ── All teams overview ────────────────────────────────────────
 @router.get("/teams")
-async def all_teams(
+def all_teams(
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """Return all teams with member counts."""
-    teams = db.query(models.Team).all()
-    return [
-        {
-            "team_id": t.team_id,
-            "team_name": t.team_name,
-            "team_lead_id": t.team_lead_id,
-            "member_count": len(t.members or []),
-        }
-        for t in teams
-    ]
+    # One GROUP BY instead of lazy-loading every team's members (N+1); plain
+    # row mappings skip ORM hydration entirely.
+    stmt = (
+        select(
+            models.Team.team_id,
+            models.Team.team_name,
+            models.Team.team_lead_id,
+            func.count(models.Employee.id).label("member_count"),
+        )
+        .outerjoin(models.Employee, models.Employee.team_id == models.Team.team_id)
+        .group_by(models.Team.team_id)
+    )
+    return db.execute(stmt).mappings().all()
 
 
 # ── Application history for a project ────────────────────────
 @router.get("/applications/{project_id}", response_model=List[schemas.ApplicationOut])
-async def project_applications(
+def project_applications(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """Return stored application/score records for a project."""
-    return (
-        db.query(models.Application)
-        .filter(models.Application.project_id == project_id)
+    # Read-only listing: select the columns ApplicationOut needs as mappings
+    # rather than hydrating Application instances into the identity map.
+    stmt = (
+        select(
+            models.Application.id,
+            models.Application.project_id,
+            models.Application.team_id,
+            models.Application.score,
+            models.Application.created_at,
+        )
+        .where(models.Application.project_id == project_id)
         .order_by(models.Application.score.desc())
-        .all()
+    )
+    rows = db.execute(stmt).mappings().all()
+    return Response(
+        content=_application_list.dump_json(_application_list.validate_python(rows)),
+        media_type="application/json",
     )
 
 
 # ── Save/persist evaluation results ──────────────────────────
 @router.post("/evaluate/{project_id}")
-async def save_evaluation(
+def save_evaluation(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """
     Run full evaluation and persist Application records for all teams.
     Safe to call multiple times (upserts by project_id + team_id).
     """
     results = rank_teams(project_id, db)
-    saved = []
+    saved = [{"team_id": r["team_id"], "score": r["final_score"]} for r in results]
 
-    for r in results:
-        existing = (
-            db.query(models.Application)
-            .filter(
-                models.Application.project_id == project_id,
-                models.Application.team_id == r["team_id"],
-            )
-            .first()
-        )
-        if existing:
-            existing.score = r["final_score"]
+    if saved:
+        # Single INSERT ... ON CONFLICT DO UPDATE instead of SELECT + INSERT/UPDATE per team
+        if db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
         else:
-            app = models.Application(
-                project_id=project_id,
-                team_id=r["team_id"],
-                score=r["final_score"],
-            )
-            db.add(app)
-        saved.append({"team_id": r["team_id"], "score": r["final_score"]})
-
-    db.commit()
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(models.Application).values(
+            [{"project_id": project_id, **row} for row in saved]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["project_id", "team_id"],
+            set_={"score": stmt.excluded.score},
+        )
+        db.execute(stmt)
+        db.commit()
+
     return {"saved": len(saved), "results": saved}
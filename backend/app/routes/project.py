@@ -3,33 +3,74 @@ routes/project.py
 Project CRUD endpoints. HR creates projects; all authenticated users can browse.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.database import get_db_for_hr, get_db
 from app import models, schemas
-from app.auth import get_current_employee, require_role
-from app.services.embedding_service import update_project_vector
+from app.auth import AuthenticatedUser, get_current_employee, require_role
+from app.cache import cache, invalidate_from_thread, tenant_cache_key
+from app.pagination import PageParams, cursor_headers, keyset_page, split_page
+from app.services.embedding_queue import enqueue_project_embedding
 
 router = APIRouter(prefix="/api/project", tags=["Project"])
 
+# Handlers are synchronous (`def`) so FastAPI runs them in its threadpool;
+# they only do blocking SQLAlchemy/FAISS work. Cached reads are `async` and
+# only hop to the threadpool on a cache miss.
+
+
+PROJECTS_CACHE_TTL = 5  # seconds; bounds staleness in other workers (see app/cache.py)
+
+
+_project_list = TypeAdapter(List[schemas.ProjectOut])
+
+
+def _load_projects(db: Session, page: PageParams) -> Tuple[bytes, Optional[int]]:
+    """Query one page of projects and render it to JSON once, in pydantic-core."""
+    stmt = keyset_page(select(models.Project), models.Project.id, page)
+    rows, next_cursor = split_page(db.scalars(stmt).all(), page, lambda p: p.id)
+    body = _project_list.dump_json(_project_list.validate_python(rows, from_attributes=True))
+    return body, next_cursor
+
 
 # ── List all projects ─────────────────────────────────────────
 @router.get("/", response_model=List[schemas.ProjectOut])
-async def list_projects(hr_id: str, db: Session = Depends(get_db_for_hr)):
-    """List all available projects for a specific HR."""
-    return db.query(models.Project).all()
+async def list_projects(
+    hr_id: str,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db_for_hr),
+):
+    """
+    List available projects for a specific HR, optionally one keyset page
+    at a time (?limit=&cursor=).
+    The full list is read-mostly and polled by the UI, so its rendered JSON
+    is served from the app cache; writes below invalidate it.
+    """
+    if not page.is_full_list:
+        body, next_cursor = await run_in_threadpool(_load_projects, db, page)
+        return Response(content=body, media_type="application/json", headers=cursor_headers(next_cursor))
+    key = tenant_cache_key(db, "projects")
+    body = await cache.get(key)
+    if body is None:
+        body, _ = await run_in_threadpool(_load_projects, db, page)
+        await cache.set(key, body, ttl=PROJECTS_CACHE_TTL)
+    # Cached body is already-validated JSON; skip jsonable_encoder + json.dumps
+    return Response(content=body, media_type="application/json")
 
 
 # ── Get single project ────────────────────────────────────────
 @router.get("/{project_id}", response_model=schemas.ProjectOut)
-async def get_project(
+def get_project(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
 ):
     """Retrieve a project by ID."""
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = db.get(models.Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -37,14 +78,14 @@ async def get_project(
 
 # ── Create project (HR only) ──────────────────────────────────
 @router.post("/", response_model=schemas.ProjectOut, status_code=201)
-async def create_project(
+def create_project(
     payload: schemas.ProjectCreate,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """
-    HR creates a project. Embedding is generated and indexed in FAISS
-    immediately after creation.
+    HR creates a project. Its embedding is queued and indexed in FAISS by
+    the batching embedding worker shortly after creation.
     """
     project = models.Project(
         title=payload.title,
@@ -53,30 +94,29 @@ async def create_project(
         required_experience=payload.required_experience,
     )
     db.add(project)
+    # Every ProjectOut field is known once the INSERT has assigned the id, so
+    # render before commit instead of re-SELECTing the expired row after it.
+    db.flush()
+    result = schemas.ProjectOut.model_validate(project)
     db.commit()
-    db.refresh(project)
 
-    # Index the project in FAISS
-    try:
-        update_project_vector(project.id, db)
-        db.refresh(project)
-    except Exception as e:
-        import logging
-        logging.getLogger("klh").warning(f"Embedding generation failed for project {project.id}: {e}")
+    # Index the project in FAISS (batched, off the request path)
+    enqueue_project_embedding(project.id, db.get_bind())
 
-    return project
+    invalidate_from_thread(tenant_cache_key(db, "projects"))
+    return result
 
 
 # ── Update project (HR only) ──────────────────────────────────
 @router.put("/{project_id}", response_model=schemas.ProjectOut)
-async def update_project(
+def update_project(
     project_id: int,
     payload: schemas.ProjectCreate,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
-    """HR updates a project and regenerates its embedding."""
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    """HR updates a project and queues regeneration of its embedding."""
+    project = db.get(models.Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -84,41 +124,41 @@ async def update_project(
     project.description = payload.description
     project.required_skills = payload.required_skills
     project.required_experience = payload.required_experience
+    result = schemas.ProjectOut.model_validate(project)
     db.commit()
-    db.refresh(project)
 
-    try:
-        update_project_vector(project.id, db)
-        db.refresh(project)
-    except Exception:
-        pass
+    enqueue_project_embedding(project_id, db.get_bind())
 
-    return project
+    invalidate_from_thread(tenant_cache_key(db, "projects"))
+    return result
 
 
 # ── Delete project (HR only) ──────────────────────────────────
 @router.delete("/{project_id}", status_code=204)
-async def delete_project(
+def delete_project(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """HR deletes a project."""
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = db.get(models.Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     db.delete(project)
     db.commit()
+    invalidate_from_thread(tenant_cache_key(db, "projects"))
     return None
 
 
 # ── Re-generate project embedding (HR only) ───────────────────
 @router.post("/{project_id}/embed")
-async def embed_project(
+def embed_project(
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
-    """Force regeneration of a project's FAISS embedding."""
-    idx = update_project_vector(project_id, db)
-    return {"message": "Embedding updated", "faiss_index": idx}
+    """Queue regeneration of a project's FAISS embedding."""
+    if not db.get(models.Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    enqueue_project_embedding(project_id, db.get_bind())
+    return {"message": "Embedding queued", "queued": True}
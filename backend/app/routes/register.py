@@ -3,38 +3,55 @@ routes/register.py
 Public self-registration endpoints for employees, team leads, and HR.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from app.database import get_db, get_db_for_hr
+from app.database import get_db, get_db_for_hr, get_hr_db, hr_exists, is_valid_hr_id
 from app import models, schemas
-from app.auth import hash_password
-from app.services.embedding_service import update_employee_vector
+from app.auth import hash_password_async
+from app.cache import cache, invalidate_from_thread, tenant_cache_key
+from app.services.embedding_queue import enqueue_employee_embedding
 
 router = APIRouter(prefix="/api/register", tags=["Registration"])
 
+# Handlers are `async`: the bcrypt hash runs on its own core-bounded limiter
+# (hash_password_async) and the blocking SQLAlchemy work is handed to the
+# threadpool in one hop, so a signup burst can't tie up threadpool workers
+# for the ~250 ms each hash takes. Cached reads only hop on a cache miss.
+# Creation helpers return schemas.EmployeeOut built while the HR session is
+# still open, so serialisation never touches a detached ORM instance.
+
 
 # ─────────────────────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────────────────────
 
+def _team_lookup_key(hr_id: str, team_code: str) -> str:
+    return f"hr:{hr_id}:team:{team_code}"
+
+
 def _assert_passwords_match(p1: str, p2: str):
     if p1 != p2:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
 
-def _assert_username_free(username: str, db: Session):
-    if db.query(models.Employee).filter(models.Employee.username == username).first():
+def _assert_registration_fields_free(db: Session, username: str, email: str, emp_id: str):
+    """
+    Check username, email and emp_id uniqueness with one indexed OR query,
+    raising for the first taken field (username, then email, then emp_id).
+    """
+    E = models.Employee
+    rows = db.execute(
+        select(E.username, E.email, E.emp_id)
+        .where(or_(E.username == username, E.email == email, E.emp_id == emp_id))
+    ).all()
+    if any(r.username == username for r in rows):
         raise HTTPException(status_code=400, detail="Username already taken")
-
-
-def _assert_email_free(email: str, db: Session):
-    if db.query(models.Employee).filter(models.Employee.email == email).first():
+    if any(r.email == email for r in rows):
         raise HTTPException(status_code=400, detail="Email already registered")
-
-
-def _assert_emp_id_free(emp_id: str, db: Session):
-    if db.query(models.Employee).filter(models.Employee.emp_id == emp_id).first():
+    if any(r.emp_id == emp_id for r in rows):
         raise HTTPException(status_code=400, detail="Employee ID already in use")
 
 
@@ -43,7 +60,7 @@ def _assert_emp_id_free(emp_id: str, db: Session):
 # ─────────────────────────────────────────────────────────────
 
 @router.post("/teamlead", response_model=schemas.EmployeeOut, status_code=201)
-def register_teamlead(
+async def register_teamlead(
     payload: schemas.TeamLeadRegister,
     db: Session = Depends(get_db),
 ):
@@ -54,68 +71,57 @@ def register_teamlead(
     2. Creates the Team record with the given team_code.
     3. Creates the Employee record (role=team_lead) and links them.
     4. Sets Team.team_lead_id to point back at the new employee.
-    5. Generates FAISS embedding (non-fatal if it fails).
+    5. Queues the FAISS embedding (non-fatal if it fails).
     """
     _assert_passwords_match(payload.password, payload.password2)
 
-    # Use HR-specific DB
-    import os
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.database import Base, _BASE_DIR
-
-    hr_db_path = os.path.join(_BASE_DIR, f"hr_{payload.hr_id}.db")
-    if not os.path.exists(hr_db_path):
+    # Use HR-specific DB (cached engine; schema is ensured once per engine)
+    if not hr_exists(payload.hr_id):
         raise HTTPException(status_code=404, detail="HR ID not found. Please check with your HR.")
-    hr_db_url = f"sqlite:///{hr_db_path}"
-    hr_engine = create_engine(hr_db_url, connect_args={"check_same_thread": False})
-    SessionHR = sessionmaker(autocommit=False, autoflush=False, bind=hr_engine)
-    Base.metadata.create_all(bind=hr_engine)
-    hr_db = SessionHR()
-    from app.auth import create_access_token
+    password_hash = await hash_password_async(payload.password)
+    return await run_in_threadpool(_create_teamlead, payload, password_hash)
+
+
+def _create_teamlead(payload: schemas.TeamLeadRegister, password_hash: str):
+    hr_db = get_hr_db(payload.hr_id)()
     try:
         # Uniqueness checks in HR DB
-        _assert_username_free(payload.username, hr_db)
-        _assert_email_free(payload.lead_email, hr_db)
-        _assert_emp_id_free(payload.lead_id, hr_db)
+        _assert_registration_fields_free(hr_db, payload.username, payload.lead_email, payload.lead_id)
         # Team code must be unique in HR DB
         if hr_db.query(models.Team).filter(models.Team.team_code == payload.team_code).first():
             raise HTTPException(status_code=400, detail="Team code already in use")
-        # 1. Create Team
+        # 1. Create Team and lead together: one flush inserts both and the
+        #    team_lead post_update fills in teams.team_lead_id.
         team = models.Team(
             team_name=payload.team_name,
             team_code=payload.team_code,
         )
-        hr_db.add(team)
-        hr_db.flush()
-        # 2. Create Team Lead employee
         lead = models.Employee(
             emp_id=payload.lead_id,
             username=payload.username,
             name=payload.lead_name,
             email=payload.lead_email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             role="team_lead",
-            team_id=team.team_id,
+            team=team,
             skills=[],
             experience=0.0,
             projects=[],
             certifications=[],
             resume_uploaded=False,
         )
-        hr_db.add(lead)
+        team.team_lead = lead
+        hr_db.add(team)
         hr_db.flush()
-        # 3. Assign team lead
-        team.team_lead_id = lead.id
+        result = schemas.EmployeeOut.model_validate(lead)
         hr_db.commit()
-        hr_db.refresh(lead)
-        # 4. Generate embedding (non-fatal)
-        try:
-            update_employee_vector(lead.id, hr_db)
-        except Exception:
-            pass
-        
-        return lead
+        invalidate_from_thread(
+            tenant_cache_key(hr_db, "teams"),
+            _team_lookup_key(payload.hr_id, payload.team_code),
+        )
+        # 2. Queue embedding generation (non-fatal, batched off the request path)
+        enqueue_employee_embedding(result.id, hr_db.get_bind())
+        return result
     finally:
         hr_db.close()
 
@@ -125,7 +131,7 @@ def register_teamlead(
 # ─────────────────────────────────────────────────────────────
 
 @router.post("/employee", response_model=schemas.EmployeeOut, status_code=201)
-def register_employee(
+async def register_employee(
     payload: schemas.EmployeeRegister,
     db: Session = Depends(get_db),
 ):
@@ -137,24 +143,17 @@ def register_employee(
     """
     _assert_passwords_match(payload.password, payload.password2)
 
-    # Use HR-specific DB
-    import os
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.database import Base, _BASE_DIR
-
-    hr_db_path = os.path.join(_BASE_DIR, f"hr_{payload.hr_id}.db")
-    if not os.path.exists(hr_db_path):
+    # Use HR-specific DB (cached engine; schema is ensured once per engine)
+    if not hr_exists(payload.hr_id):
         raise HTTPException(status_code=404, detail="HR ID not found. Please check with your HR.")
-    hr_db_url = f"sqlite:///{hr_db_path}"
-    hr_engine = create_engine(hr_db_url, connect_args={"check_same_thread": False})
-    SessionHR = sessionmaker(autocommit=False, autoflush=False, bind=hr_engine)
-    Base.metadata.create_all(bind=hr_engine)
-    hr_db = SessionHR()
+    password_hash = await hash_password_async(payload.password)
+    return await run_in_threadpool(_create_employee, payload, password_hash)
+
+
+def _create_employee(payload: schemas.EmployeeRegister, password_hash: str):
+    hr_db = get_hr_db(payload.hr_id)()
     try:
-        _assert_username_free(payload.username, hr_db)
-        _assert_email_free(payload.email, hr_db)
-        _assert_emp_id_free(payload.emp_id, hr_db)
+        _assert_registration_fields_free(hr_db, payload.username, payload.email, payload.emp_id)
         # Team must exist in HR DB
         team = hr_db.query(models.Team).filter(models.Team.team_code == payload.team_code).first()
         if not team:
@@ -167,7 +166,7 @@ def register_employee(
             username=payload.username,
             name=payload.name,
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             role="employee",
             team_id=team.team_id,
             skills=[],
@@ -179,13 +178,8 @@ def register_employee(
         hr_db.add(employee)
         hr_db.commit()
         hr_db.refresh(employee)
-        try:
-            update_employee_vector(employee.id, hr_db)
-        except Exception:
-            pass
-        # Convert to dict before closing session to prevent DetachedInstanceError
-        result = schemas.EmployeeOut.model_validate(employee)
-        return result
+        enqueue_employee_embedding(employee.id, hr_db.get_bind())
+        return schemas.EmployeeOut.model_validate(employee)
     finally:
         hr_db.close()
 
@@ -195,40 +189,31 @@ def register_employee(
 # ─────────────────────────────────────────────────────────────
 
 @router.post("/hr", response_model=schemas.EmployeeOut, status_code=201)
-def register_hr(
+async def register_hr(
     payload: schemas.HRRegister,
     db: Session = Depends(get_db),
 ):
     """Register a new HR user (no team affiliation)."""
     _assert_passwords_match(payload.password, payload.password2)
-    _assert_username_free(payload.username, db)
-    _assert_email_free(payload.email, db)
-    _assert_emp_id_free(payload.hr_id, db)
-
-    # Create a new SQLite DB for this HR
-    import os
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.database import Base, _BASE_DIR
-
-    hr_db_path = os.path.join(_BASE_DIR, f"hr_{payload.hr_id}.db")
-    hr_db_url = f"sqlite:///{hr_db_path}"
-    hr_engine = create_engine(hr_db_url, connect_args={"check_same_thread": False})
-    SessionHR = sessionmaker(autocommit=False, autoflush=False, bind=hr_engine)
-
-    # Create tables if not exist
-    Base.metadata.create_all(bind=hr_engine)
-
-    # Add HR user to their own DB
-    hr_db = SessionHR()
-    from app.auth import create_access_token
+    if not is_valid_hr_id(payload.hr_id):
+        raise HTTPException(status_code=400, detail="HR ID may only contain letters, digits, '_' and '-'")
+    password_hash = await hash_password_async(payload.password)
+    return await run_in_threadpool(_create_hr, db, payload, password_hash)
+
+
+def _create_hr(db: Session, payload: schemas.HRRegister, password_hash: str):
+    _assert_registration_fields_free(db, payload.username, payload.email, payload.hr_id)
+
+    # Create (or open) the SQLite DB for this HR; get_hr_db builds the schema
+    # and records the tenant as existing.
+    hr_db = get_hr_db(payload.hr_id)()
     try:
         hr_user = models.Employee(
             emp_id=payload.hr_id,
             username=payload.username,
             name=payload.name,
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             role="hr",
             team_id=None,
             skills=[],
@@ -240,37 +225,42 @@ def register_hr(
         hr_db.add(hr_user)
         hr_db.commit()
         hr_db.refresh(hr_user)
+        return schemas.EmployeeOut.model_validate(hr_user)
     finally:
         hr_db.close()
 
-    return hr_user
-
 
 # ─────────────────────────────────────────────────────────────
 # Team code lookup (used by frontend to auto-fill team name)
 # ─────────────────────────────────────────────────────────────
 
-@router.get("/team-lookup/{team_code}", response_model=schemas.TeamOut)
-async def team_lookup(team_code: str, hr_id: str, db: Session = Depends(get_db)):
-    """Return team info for a given team_code and hr_id (no auth required)."""
-    import os
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.database import Base, _BASE_DIR
-
-    hr_db_path = os.path.join(_BASE_DIR, f"hr_{hr_id}.db")
-    if not os.path.exists(hr_db_path):
-        raise HTTPException(status_code=404, detail="HR ID not found.")
-    hr_db_url = f"sqlite:///{hr_db_path}"
-    hr_engine = create_engine(hr_db_url, connect_args={"check_same_thread": False})
-    SessionHR = sessionmaker(autocommit=False, autoflush=False, bind=hr_engine)
-    hr_db = SessionHR()
+TEAM_LOOKUP_CACHE_TTL = 5  # seconds; bounds staleness in other workers (see app/cache.py)
+
+
+def _lookup_team(hr_id: str, team_code: str):
+    """Return the team as rendered JSON bytes, or None if the code is unknown."""
+    hr_db = get_hr_db(hr_id)()
     try:
         team = hr_db.query(models.Team).filter(models.Team.team_code == team_code).first()
-        if not team:
-            raise HTTPException(status_code=404, detail="Team not found")
-        # Detach before closing session
-        hr_db.expunge(team)
-        return team
+        return schemas.TeamOut.model_validate(team).model_dump_json().encode() if team else None
     finally:
         hr_db.close()
+
+
+@router.get("/team-lookup/{team_code}", response_model=schemas.TeamOut)
+async def team_lookup(team_code: str, hr_id: str, db: Session = Depends(get_db)):
+    """
+    Return team info for a given team_code and hr_id (no auth required).
+    Hit on every keystroke of the registration form, so found teams are
+    served from the app cache.
+    """
+    if not hr_exists(hr_id):
+        raise HTTPException(status_code=404, detail="HR ID not found.")
+    key = _team_lookup_key(hr_id, team_code)
+    body = await cache.get(key)
+    if body is None:
+        body = await run_in_threadpool(_lookup_team, hr_id, team_code)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Team not found")
+        await cache.set(key, body, ttl=TEAM_LOOKUP_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
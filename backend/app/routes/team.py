@@ -3,53 +3,98 @@ routes/team.py
 Team Lead-facing endpoints: team overview, skill heatmap, skill gaps.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, raiseload, selectinload
+from typing import List, Optional, Tuple
 
 from app.database import get_db_for_hr
 from app import models, schemas
-from app.auth import get_current_employee, require_role
+from app.auth import AuthenticatedUser, get_current_employee, require_role
+from app.cache import cache, invalidate_from_thread, tenant_cache_key
+from app.pagination import PageParams, cursor_headers, keyset_page, split_page
+from app.services.embedding_service import refresh_team_embeddings
 from app.services.team_service import (
-    get_team_members,
+    get_team_members_page,
     get_team_skill_heatmap,
     get_individual_skill_gap,
 )
 
 router = APIRouter(prefix="/api/team", tags=["Team"])
 
+# Handlers are synchronous (`def`) so FastAPI runs them in its threadpool;
+# they only do blocking SQLAlchemy/FAISS work. Cached reads are `async` and
+# only hop to the threadpool on a cache miss.
+#
+# Relationship loading: responses that serialise `members` load them up front
+# with selectinload (one extra SELECT ... IN, regardless of team size); listings
+# that never touch relationships use raiseload("*") so an accidental lazy load
+# fails loudly instead of silently issuing a query per row.
+
+
+TEAMS_CACHE_TTL = 5  # seconds; bounds staleness in other workers (see app/cache.py)
+
+
+_team_list = TypeAdapter(List[schemas.TeamOut])
+_employee_list = TypeAdapter(List[schemas.EmployeeOut])
+
+
+def _load_teams(db: Session, page: PageParams) -> Tuple[bytes, Optional[int]]:
+    """Query one page of teams and render it to JSON once, in pydantic-core."""
+    stmt = keyset_page(select(models.Team).options(raiseload("*")), models.Team.team_id, page)
+    teams, next_cursor = split_page(db.scalars(stmt).all(), page, lambda t: t.team_id)
+    body = _team_list.dump_json(_team_list.validate_python(teams, from_attributes=True))
+    return body, next_cursor
+
 
 # ── List all teams ────────────────────────────────────────────
 @router.get("/", response_model=List[schemas.TeamOut])
-async def list_teams(db: Session = Depends(get_db_for_hr)):
-    """Return all teams (public endpoint for nav/selection)."""
-    return db.query(models.Team).all()
+async def list_teams(page: PageParams = Depends(), db: Session = Depends(get_db_for_hr)):
+    """
+    Return teams (public endpoint for nav/selection), optionally one keyset
+    page at a time (?limit=&cursor=). The full list comes from the app cache.
+    """
+    if not page.is_full_list:
+        body, next_cursor = await run_in_threadpool(_load_teams, db, page)
+        return Response(content=body, media_type="application/json", headers=cursor_headers(next_cursor))
+    key = tenant_cache_key(db, "teams")
+    body = await cache.get(key)
+    if body is None:
+        body, _ = await run_in_threadpool(_load_teams, db, page)
+        await cache.set(key, body, ttl=TEAMS_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
 
 
 # ── Create a team (HR only) ───────────────────────────────────
 @router.post("/", response_model=schemas.TeamOut, status_code=201)
-async def create_team(
+def create_team(
     payload: schemas.TeamCreate,
     db: Session = Depends(get_db_for_hr),
-    _: models.Employee = Depends(require_role("hr")),
+    _: AuthenticatedUser = Depends(require_role("hr")),
 ):
     """HR creates a new team."""
     team = models.Team(team_name=payload.team_name, team_lead_id=payload.team_lead_id)
     db.add(team)
+    db.flush()
+    # The lead's vector is weighted higher in the stored team embedding
+    refresh_team_embeddings([team.team_id], db)
     db.commit()
     db.refresh(team)
+    invalidate_from_thread(tenant_cache_key(db, "teams"))
     return team
 
 
 # ── Team detail ───────────────────────────────────────────────
 @router.get("/{team_id}", response_model=schemas.TeamDetailOut)
-async def get_team(
+def get_team(
     team_id: int,
     db: Session = Depends(get_db_for_hr),
     _: models.Employee = Depends(get_current_employee),
 ):
     """Return a team with all its members."""
-    team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
+    team = db.get(models.Team, team_id, options=[selectinload(models.Team.members)])
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team
@@ -57,21 +102,24 @@ async def get_team(
 
 # ── Team members only ─────────────────────────────────────────
 @router.get("/{team_id}/members", response_model=List[schemas.EmployeeOut])
-async def team_members(
+def team_members(
     team_id: int,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db_for_hr),
-    current: models.Employee = Depends(require_role("team_lead", "hr")),
+    current: AuthenticatedUser = Depends(require_role("team_lead", "hr")),
 ):
-    """Return members of a team (Team Lead or HR only)."""
-    return get_team_members(team_id, db)
+    """Return members of a team (Team Lead or HR only), optionally paginated."""
+    members, next_cursor = get_team_members_page(team_id, db, page)
+    body = _employee_list.dump_json(_employee_list.validate_python(members, from_attributes=True))
+    return Response(content=body, media_type="application/json", headers=cursor_headers(next_cursor))
 
 
 # ── Skill heatmap ─────────────────────────────────────────────
 @router.get("/{team_id}/heatmap", response_model=schemas.TeamSkillHeatmap)
-async def skill_heatmap(
+def skill_heatmap(
     team_id: int,
     db: Session = Depends(get_db_for_hr),
-    current: models.Employee = Depends(require_role("team_lead", "hr")),
+    current: AuthenticatedUser = Depends(require_role("team_lead", "hr")),
 ):
     """
     Return per-employee skill data suitable for heatmap visualisation.
@@ -82,12 +130,12 @@ async def skill_heatmap(
 
 # ── Individual skill gap ──────────────────────────────────────
 @router.get("/{team_id}/skill-gap/{employee_id}")
-async def individual_skill_gap(
+def individual_skill_gap(
     team_id: int,
     employee_id: int,
     project_id: int,
     db: Session = Depends(get_db_for_hr),
-    current: models.Employee = Depends(require_role("team_lead", "hr")),
+    current: AuthenticatedUser = Depends(require_role("team_lead", "hr")),
 ):
     """
     Skill gap for a specific team member against a specific project.
@@ -1,11 +1,27 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'security.log')
-logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+# Request threads only enqueue records; a listener thread does the file I/O,
+# so a burst of failed logins never serialises on disk writes.
+_file_handler = RotatingFileHandler(LOG_FILE, maxBytes=10_000_000, backupCount=5, delay=True)
+_file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+_log_queue = queue.Queue(-1)
+_listener = QueueListener(_log_queue, _file_handler)
+_listener.start()
+atexit.register(_listener.stop)
+
+logger = logging.getLogger("security")
+logger.addHandler(QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
+logger.propagate = False
 
 def log_failed_login(email, reason):
-    logging.warning(f"Failed login for {email}: {reason}")
+    logger.warning("Failed login for %s: %s", email, reason)
 
 def log_suspicious_access(user, detail):
-    logging.warning(f"Suspicious access by {user}: {detail}")
+    logger.warning("Suspicious access by %s: %s", user, detail)
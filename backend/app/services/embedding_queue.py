@@ -0,0 +1,139 @@
+"""
+embedding_queue.py
+Coalesces embedding refreshes requested by HTTP handlers into batches.
+
+Handlers call enqueue_employee_embedding / enqueue_project_embedding and
+return immediately. A single worker thread drains the queue, waiting up to
+MAX_WAIT_SECONDS for up to BATCH_SIZE items, and embeds each (kind, tenant)
+group with one encoder forward pass and one FAISS append. The worker is the
+only writer the web process uses, so index writes never race each other.
+
+enqueue returns a Future resolved with the assigned FAISS row once the
+batch is processed; a handler that needs the result can await it with
+asyncio.wrap_future instead of embedding on a request thread.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+from app.services.embedding_service import process_embedding_batch
+
+logger = logging.getLogger("klh")
+
+BATCH_SIZE = 32
+MAX_WAIT_SECONDS = 0.2
+
+_STOP = object()
+
+
+class EmbeddingQueue:
+    """
+    Thread-backed batching queue.
+    `process_batch(kind, ids, bind)` is called once per (kind, bind) group in
+    a batch; ids are de-duplicated and keep their enqueue order. It may
+    return {id: result}, which resolves the futures handed out by enqueue.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[str, List[int], object], Optional[dict]],
+        batch_size: int = BATCH_SIZE,
+        max_wait: float = MAX_WAIT_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._process_batch = process_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def enqueue(self, kind: str, obj_id: int, bind) -> Future:
+        """Schedule (re-)embedding of one employee or project."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((kind, obj_id, bind, future))
+        return future
+
+    def join(self) -> None:
+        """Block until everything enqueued so far has been processed."""
+        self._queue.join()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Process what is already queued, then stop the worker."""
+        with self._thread_lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_worker(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-queue", daemon=True
+                )
+                self._thread.start()
+
+    def _next_batch(self):
+        """Wait for one item, then collect more until the batch is full or MAX_WAIT elapses."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            batch, stop = self._next_batch()
+            try:
+                self._flush(batch)
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _flush(self, batch) -> None:
+        groups: dict = {}
+        for kind, obj_id, bind, future in batch:
+            groups.setdefault((kind, bind), {}).setdefault(obj_id, []).append(future)
+        for (kind, bind), ids in groups.items():
+            try:
+                results = self._process_batch(kind, list(ids), bind) or {}
+            except Exception as e:
+                logger.warning("Embedding batch failed for %d %s(s): %s", len(ids), kind, e)
+                for futures in ids.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+            for obj_id, futures in ids.items():
+                for future in futures:
+                    future.set_result(results.get(obj_id))
+
+
+embedding_queue = EmbeddingQueue(process_embedding_batch)
+
+
+def enqueue_employee_embedding(employee_id: int, bind) -> Future:
+    return embedding_queue.enqueue("employee", employee_id, bind)
+
+
+def enqueue_project_embedding(project_id: int, bind) -> Future:
+    return embedding_queue.enqueue("project", project_id, bind)
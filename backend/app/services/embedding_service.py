@@ -6,44 +6,108 @@ Two separate FAISS indices:
   - employee_index  → one vector per employee
   - project_index   → one vector per project
 
-Index files are persisted to disk so they survive restarts.
+Index files are persisted to disk so they survive restarts; each process
+keeps a double-buffered in-memory copy so lookups never re-read the file
+(it is reloaded only when the file's mtime shows another process wrote it).
+On startup the files are memory-mapped read-only, so a worker boots with a
+warm index backed by the OS page cache instead of rebuilding or copying it.
 """
 
 import os
+import hashlib
 import json
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 try:
     import faiss
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
+try:
+    import fcntl
+except ImportError:  # Windows: index writes are only serialised within a process
+    fcntl = None
 from sentence_transformers import SentenceTransformer
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
 from app import models
+from app.cache import invalidate_from_thread, tenant_cache_key
 
 # ── Model ─────────────────────────────────────────────────────────────────────
 # all-MiniLM-L6-v2 produces 384-dim embeddings; fast and accurate
 _model: Optional[SentenceTransformer] = None
 
 from app.config import settings
+logger = logging.getLogger("klh")
 EMBEDDING_DIM = 384
 EMPLOYEE_INDEX_PATH = settings.faiss_index_path
 PROJECT_INDEX_PATH = settings.faiss_project_index_path
 
 
+def compute_threads() -> int:
+    """Threads each process may use for encoding and search (settings.compute_threads)."""
+    if settings.compute_threads > 0:
+        return settings.compute_threads
+    try:
+        workers = max(int(os.environ.get("WEB_CONCURRENCY", "1")), 1)
+    except ValueError:
+        workers = 1
+    return max((os.cpu_count() or 1) // workers, 1)
+
+
+def _configure_threads() -> None:
+    """
+    Size the torch and FAISS (OpenMP) thread pools explicitly: some wheels
+    default torch to a single thread, and OpenMP's default of one thread per
+    core oversubscribes the CPU once several workers run.
+    """
+    n = compute_threads()
+    import torch
+    torch.set_num_threads(n)
+    if FAISS_AVAILABLE:
+        faiss.omp_set_num_threads(n)
+
+
+def _load_model() -> SentenceTransformer:
+    """Build the encoder for the configured backend, falling back to torch."""
+    if settings.embedding_backend == "onnx":
+        model_kwargs = {"file_name": settings.embedding_onnx_file} if settings.embedding_onnx_file else None
+        try:
+            return SentenceTransformer(settings.embedding_model, backend="onnx", model_kwargs=model_kwargs)
+        except Exception as e:  # old sentence-transformers (no `backend`), missing onnxruntime/optimum
+            logger.warning("ONNX embedding backend unavailable, using torch: %s", e)
+    return SentenceTransformer(settings.embedding_model)
+
+
 def _get_model() -> SentenceTransformer:
     """Lazy-load the sentence-transformer model (once per process)."""
     global _model
     if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        _configure_threads()
+        model = _load_model()
+        if settings.embedding_max_seq_length:
+            model.max_seq_length = settings.embedding_max_seq_length
+        _model = model
     return _model
 
 
 # ── FAISS helpers ─────────────────────────────────────────────────────────────
 
-def _load_or_create_index(path: str) -> faiss.IndexFlatIP:
+# Serialises writers (add → save) on an index. Row numbers are assigned from
+# `ntotal`, so two unsynchronised writers would hand out the same row and the
+# last save would silently drop the other's vectors. Readers never take it.
+# This lock covers threads; _index_file_lock extends it across processes.
+_INDEX_LOCK = threading.RLock()
+
+
+def _load_or_create_index(path: str) -> "faiss.Index":
     """
     Load a FAISS inner-product (cosine) index from disk, or create a fresh one.
     Vectors must be L2-normalised before adding for cosine similarity to hold.
@@ -55,22 +119,363 @@ def _load_or_create_index(path: str) -> faiss.IndexFlatIP:
             def reconstruct(self, idx): return np.zeros((1, EMBEDDING_DIM), dtype=np.float32)
         return DummyIndex()
     if os.path.exists(path):
-        return faiss.read_index(path)
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    return _new_index()
+
+
+def _new_index():
+    """
+    Empty index for settings.faiss_storage: "fp16" keeps each 384-dim row in
+    768 bytes (half of float32) at a negligible cost in cosine accuracy for
+    unit vectors; "fp32" is an exact IndexFlatIP. Both score by inner product
+    and need no training. Existing files keep the type they were written with.
+    """
+    if settings.faiss_storage == "fp16":
+        return faiss.IndexScalarQuantizer(
+            EMBEDDING_DIM, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
     return faiss.IndexFlatIP(EMBEDDING_DIM)
 
 
-def _save_index(index: faiss.IndexFlatIP, path: str) -> None:
+def _matrix_path(path: str) -> str:
+    return f"{path}.f32"
+
+
+def _save_index(index: "faiss.Index", path: str) -> None:
+    """Write the index next to `path` and rename it into place atomically."""
     if FAISS_AVAILABLE:
-        faiss.write_index(index, path)
+        tmp_path = f"{path}.tmp"
+        faiss.write_index(index, tmp_path)
+        # Readers (and mmaps of the old file) never see a half-written index
+        os.replace(tmp_path, path)
+
+
+def _save_matrix(index: "faiss.Index", path: str, start: int) -> None:
+    """
+    Keep `<path>.f32`, the raw (ntotal, 384) float32 rows, in step with the
+    index so bulk lookups can slice a memmap instead of reconstructing from
+    FAISS. Rows are only ever appended, so rows from `start` on are added to
+    the end of the file; it is rewritten whole only when missing or out of
+    step (e.g. after another process's write or an interrupted append).
+    """
+    if not FAISS_AVAILABLE:
+        return
+    matrix_path = _matrix_path(path)
+    row_bytes = EMBEDDING_DIM * 4
+    try:
+        size = os.path.getsize(matrix_path)
+    except FileNotFoundError:
+        size = None
+    if size == start * row_bytes:
+        with open(matrix_path, "ab") as f:
+            f.write(index.reconstruct_n(start, index.ntotal - start).astype(np.float32, copy=False).tobytes())
+        return
+    index.reconstruct_n(0, index.ntotal).astype(np.float32, copy=False).tofile(f"{matrix_path}.tmp")
+    os.replace(f"{matrix_path}.tmp", matrix_path)
+
+
+class _DoubleBufferedIndex:
+    """
+    Two copies of one FAISS index: readers use the active copy while a writer
+    appends to the idle one, then the roles swap and the same vectors are
+    replayed into the copy that just went idle. Readers only touch a counter
+    under a short lock, never the index mutation, so lookups don't stall
+    behind an add. Writers must hold _INDEX_LOCK.
+
+    `index` may be a read-only mmap of the index file; it serves reads until
+    the first add, after which it is replaced by an in-memory copy. The
+    second copy is only made by that first add, so a process that never
+    writes never copies the index into RAM.
+    """
+
+    def __init__(self, index, mapped: bool = False):
+        self._buffers = [index, None]
+        self._mapped = [mapped, False]
+        self._active = 0
+        self._readers = [0, 0]
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reading(self):
+        """Yield the active index; it will not be mutated until released."""
+        with self._cond:
+            slot = self._active
+            self._readers[slot] += 1
+        try:
+            yield self._buffers[slot]
+        finally:
+            with self._cond:
+                self._readers[slot] -= 1
+                if not self._readers[slot]:
+                    self._cond.notify_all()
+
+    @property
+    def active(self):
+        return self._buffers[self._active]
+
+    def add(self, vecs: np.ndarray) -> int:
+        """Append vectors to both copies; returns the first new row index."""
+        idle = 1 - self._active
+        if self._buffers[idle] is None:
+            self._buffers[idle] = faiss.clone_index(self._buffers[self._active])
+        start = self._buffers[idle].ntotal
+        self._buffers[idle].add(vecs)
+        with self._cond:
+            self._active, retired = idle, self._active
+            # Wait out readers that picked up the old copy before the swap
+            while self._readers[retired]:
+                self._cond.wait()
+        if self._mapped[retired]:
+            self._buffers[retired] = faiss.clone_index(self._buffers[idle])
+            self._mapped[retired] = False
+        else:
+            self._buffers[retired].add(vecs)
+        return start
+
+
+# How often a lookup re-stats an index file to pick up writes made by another
+# process (a second worker, seed.py). Our own saves update the recorded mtime.
+INDEX_RELOAD_CHECK_SECONDS = 1.0
+
+_index_stores: Dict[str, _DoubleBufferedIndex] = {}
+_index_mtimes: Dict[str, Optional[int]] = {}
+_index_checked_at: Dict[str, float] = {}
+
+
+def _file_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _get_index_store(path: str, force_check: bool = False) -> _DoubleBufferedIndex:
+    """
+    In-process index for `path`, loaded from disk on first use and reloaded
+    when the file's mtime shows another process has rewritten it.
+    """
+    store = _index_stores.get(path)
+    now = time.monotonic()
+    if store is not None and not force_check:
+        if now - _index_checked_at.get(path, 0.0) < INDEX_RELOAD_CHECK_SECONDS:
+            return store
+        # Don't queue readers behind a writer; check again on a later call
+        if not _INDEX_LOCK.acquire(blocking=False):
+            return store
+    else:
+        _INDEX_LOCK.acquire()
+    try:
+        store = _index_stores.get(path)
+        _index_checked_at[path] = now
+        mtime = _file_mtime(path)
+        if store is None or (mtime is not None and mtime != _index_mtimes.get(path)):
+            store = _DoubleBufferedIndex(_load_or_create_index(path), mapped=mtime is not None)
+            _index_stores[path] = store
+            _index_mtimes[path] = mtime
+        return store
+    finally:
+        _INDEX_LOCK.release()
+
+
+def warm_indices() -> None:
+    """Load (mmap) the employee and project indices ahead of the first request."""
+    if FAISS_AVAILABLE:
+        faiss.omp_set_num_threads(compute_threads())
+        for path in (EMPLOYEE_INDEX_PATH, PROJECT_INDEX_PATH):
+            _get_index_store(path)
+
+
+@contextmanager
+def _index_file_lock(path: str):
+    """
+    Exclusive flock on `<path>.lock`, held across reload → add → save so two
+    processes (web workers, seed.py) never hand out the same start row.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _append_vectors(path: str, vecs: np.ndarray) -> int:
+    """Add normalised vectors to the index at `path`, persist it, return the first row."""
+    with _INDEX_LOCK, _index_file_lock(path):
+        # Append to the latest on-disk version, never over another process's write
+        store = _get_index_store(path, force_check=True)
+        start = store.add(vecs)
+        _save_index(store.active, path)
+        _save_matrix(store.active, path, start)
+        _index_mtimes[path] = _file_mtime(path)
+    return start
+
+
+_matrices: Dict[str, tuple] = {}
+
+
+def _get_matrix(path: str) -> Optional[np.ndarray]:
+    """
+    Read-only (ntotal, 384) memmap of the vectors saved with the index at
+    `path`, or None if the file is missing or empty. Re-opened when the
+    file's mtime changes; an old map stays valid after os.replace.
+    """
+    matrix_path = _matrix_path(path)
+    mtime = _file_mtime(matrix_path)
+    if mtime is None:
+        return None
+    cached = _matrices.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    rows = os.path.getsize(matrix_path) // (EMBEDDING_DIM * 4)
+    matrix = (
+        np.memmap(matrix_path, dtype=np.float32, mode="r", shape=(rows, EMBEDDING_DIM))
+        if rows else None
+    )
+    _matrices[path] = (mtime, matrix)
+    return matrix
+
+
+def get_employee_matrix() -> Optional[np.ndarray]:
+    """All employee vectors as a zero-copy memmap; row i is FAISS row i."""
+    return _get_matrix(EMPLOYEE_INDEX_PATH)
+
+
+def _gather_rows(path: str, rows: np.ndarray) -> tuple:
+    """
+    Vectors for FAISS `rows` of the index at `path`, plus the mask of rows
+    that exist. Fancy-indexes the memmapped matrix; falls back to a batched
+    FAISS reconstruct when the matrix is missing or older than the index.
+    """
+    with _get_index_store(path).reading() as index:
+        present = rows < index.ntotal
+        matrix = _get_matrix(path)
+        if matrix is not None and matrix.shape[0] >= index.ntotal:
+            return matrix[rows[present]], present
+        return index.reconstruct_batch(rows[present]), present
+
+
+def _reconstruct(path: str, row: Optional[int]) -> Optional[np.ndarray]:
+    with _get_index_store(path).reading() as index:
+        if row is None or row >= index.ntotal:
+            return None
+        return index.reconstruct(row).reshape(1, -1)
 
 
 def _normalize(vec: np.ndarray) -> np.ndarray:
-    """L2-normalise a 1-D or 2-D numpy array in place and return it."""
+    """
+    L2-normalise a 1-D or 2-D numpy array and return it as (n, dim) float32.
+    Contiguous float32 input is scaled in place (no copy); zero rows stay zero.
+    """
     if vec.ndim == 1:
         vec = vec.reshape(1, -1)
-    norms = np.linalg.norm(vec, axis=1, keepdims=True)
-    norms = np.where(norms == 0, 1e-10, norms)
-    return (vec / norms).astype(np.float32)
+    vec = np.ascontiguousarray(vec, dtype=np.float32)
+    # einsum computes the row dot products in one pass without a vec*vec temporary
+    inv = 1.0 / np.sqrt(np.einsum("ij,ij->i", vec, vec) + 1e-20)
+    np.multiply(vec, inv[:, None], out=vec)
+    return vec
+
+
+# ── Approximate search ────────────────────────────────────────────────────────
+# The base indices (flat fp32 or fp16, see _new_index) stay the source of truth.
+# For large candidate sets an IVF-PQ or HNSW index (settings.faiss_ann_kind)
+# built from a snapshot of the flat one narrows the search; candidates are then re-scored exactly. Snapshots are
+# immutable, so searches need no locking; rows added after the snapshot are
+# scored exactly until it is rebuilt.
+
+class _AnnSnapshot:
+    def __init__(self, index, ntotal: int):
+        self.index = index
+        self.ntotal = ntotal
+
+
+_ann_snapshots: Dict[str, _AnnSnapshot] = {}
+_ann_build_lock = threading.Lock()
+
+
+def _build_ivfpq(vectors: np.ndarray):
+    nlist = max(1, min(settings.faiss_ivf_nlist, len(vectors) // 39))
+    quantizer = faiss.IndexFlatIP(EMBEDDING_DIM)
+    index = faiss.IndexIVFPQ(
+        quantizer, EMBEDDING_DIM, nlist,
+        settings.faiss_pq_m, settings.faiss_pq_nbits, faiss.METRIC_INNER_PRODUCT,
+    )
+    index.train(vectors[: max(settings.faiss_ann_threshold, 39 * nlist)])
+    index.add(vectors)
+    return index
+
+
+def _build_hnsw(vectors: np.ndarray):
+    index = faiss.IndexHNSWFlat(EMBEDDING_DIM, settings.faiss_hnsw_m, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = settings.faiss_hnsw_ef_construction
+    index.add(vectors)
+    return index
+
+
+def _build_ann(vectors: np.ndarray):
+    if settings.faiss_ann_kind == "hnsw":
+        return _build_hnsw(vectors)
+    return _build_ivfpq(vectors)
+
+
+def _ann_search_params(candidates: np.ndarray, index):
+    """Search parameters restricting `index` to the candidate rows."""
+    sel = faiss.IDSelectorBatch(candidates)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=settings.faiss_hnsw_ef_search)
+    return faiss.SearchParametersIVF(sel=sel, nprobe=settings.faiss_nprobe)
+
+
+def _get_ann_snapshot(path: str, flat) -> Optional[_AnnSnapshot]:
+    """Current ANN snapshot for `path`, (re)building it when it has drifted >10% behind."""
+    snap = _ann_snapshots.get(path)
+    stale = snap is None or flat.ntotal - snap.ntotal > max(1000, snap.ntotal // 10)
+    # Only one thread builds; others keep using the previous snapshot meanwhile
+    if stale and _ann_build_lock.acquire(blocking=False):
+        try:
+            snap = _AnnSnapshot(_build_ann(flat.reconstruct_n(0, flat.ntotal)), flat.ntotal)
+            _ann_snapshots[path] = snap
+        finally:
+            _ann_build_lock.release()
+    return snap
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first: O(n) partition, then sort k."""
+    if k < len(scores):
+        part = np.argpartition(-scores, k)[:k]
+        return part[np.argsort(-scores[part], kind="stable")]
+    return np.argsort(-scores, kind="stable")
+
+
+def search_vectors(path: str, query: np.ndarray, rows: List[int], k: int) -> List[tuple]:
+    """
+    Top-k (row, cosine similarity) among the given index rows for a unit
+    query vector, best first. Similarities are always exact.
+    """
+    rows = np.unique(np.asarray([r for r in rows if r is not None], dtype=np.int64))
+    if not FAISS_AVAILABLE:
+        return [(int(r), 0.0) for r in rows[:k]]
+
+    query = query.reshape(1, -1).astype(np.float32)
+    with _get_index_store(path).reading() as flat:
+        candidates = rows[rows < flat.ntotal]
+        if len(candidates) >= settings.faiss_ann_threshold:
+            snap = _get_ann_snapshot(path, flat)
+            if snap is not None:
+                params = _ann_search_params(candidates, snap.index)
+                _, found = snap.index.search(query, 4 * k, params=params)
+                found = found[0][found[0] >= 0]
+                candidates = np.union1d(found, candidates[candidates >= snap.ntotal])
+        if not len(candidates):
+            return []
+        sims = flat.reconstruct_batch(candidates) @ query.ravel()
+
+    top = _top_k(sims, k)
+    return [(int(candidates[i]), float(sims[i])) for i in top]
 
 
 # ── Text serialisation helpers ────────────────────────────────────────────────
@@ -105,18 +510,87 @@ def _project_to_text(project: models.Project) -> str:
 
 # ── Public API ────────────────────────────────────────────────────────────────
 
+ENCODE_BATCH_SIZE = 64
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    """
+    Encode texts in batches of ENCODE_BATCH_SIZE into unit float32 rows.
+    The model normalises in its own forward pass (normalize_embeddings).
+    """
+    vecs = _get_model().encode(
+        texts, batch_size=ENCODE_BATCH_SIZE, convert_to_numpy=True, normalize_embeddings=True
+    )
+    return np.ascontiguousarray(vecs, dtype=np.float32).reshape(len(texts), -1)
+
+
+def _init_encode_worker() -> None:
+    # The pool supplies the parallelism: one torch thread per worker process
+    settings.compute_threads = 1
+
+
+def _encode_parallel(texts: List[str], processes: int) -> np.ndarray:
+    """
+    _encode split across `processes` spawned CPU workers, each loading its
+    own single-threaded model. The model load per worker only pays off for
+    large corpora, so smaller inputs are encoded in-process. The caller's
+    main module must be import-safe (spawn re-imports it).
+    """
+    if processes <= 1 or len(texts) < processes * ENCODE_BATCH_SIZE:
+        return _encode(texts)
+    size = -(-len(texts) // processes)
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    with ProcessPoolExecutor(
+        max_workers=len(chunks),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_encode_worker,
+    ) as pool:
+        return np.vstack(list(pool.map(_encode, chunks)))
+
+
+def generate_employee_embeddings(employees: List[models.Employee]) -> np.ndarray:
+    """Return an (n, 384) matrix of normalised employee embeddings, encoded in batches."""
+    return _encode([_employee_to_text(e) for e in employees])
+
+
+def generate_project_embeddings(projects: List[models.Project]) -> np.ndarray:
+    """Return an (n, 384) matrix of normalised project embeddings, encoded in batches."""
+    return _encode([_project_to_text(p) for p in projects])
+
+
+def _content_hash(text: str) -> str:
+    """
+    SHA-256 of the model name and the text that gets embedded. A row whose
+    stored embedding_hash still matches has an up-to-date vector.
+    """
+    model = f"{settings.embedding_model}:{settings.embedding_max_seq_length or ''}"
+    return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+
 def generate_employee_embedding(employee: models.Employee) -> np.ndarray:
     """Return normalised 384-dim embedding for an employee."""
-    text = _employee_to_text(employee)
-    vec = _get_model().encode(text, convert_to_numpy=True)
-    return _normalize(vec)
+    return generate_employee_embeddings([employee])
 
 
 def generate_project_embedding(project: models.Project) -> np.ndarray:
     """Return normalised 384-dim embedding for a project."""
-    text = _project_to_text(project)
-    vec = _get_model().encode(text, convert_to_numpy=True)
-    return _normalize(vec)
+    return generate_project_embeddings([project])
+
+
+def update_employee_vector_by_obj(employee: models.Employee, db: Session) -> int:
+    """
+    Embed an already-loaded employee, append the vector to the FAISS
+    employee index and refresh its team's stored embedding. Does not
+    commit; returns the FAISS row index assigned.
+    """
+    vec = generate_employee_embedding(employee)
+    row_idx = _append_vectors(EMPLOYEE_INDEX_PATH, vec) if FAISS_AVAILABLE else 0
+    employee.embedding_index = row_idx
+    employee.embedding_hash = _content_hash(_employee_to_text(employee))
+    if FAISS_AVAILABLE and employee.team_id is not None:
+        db.flush()
+        refresh_team_embeddings([employee.team_id], db)
+    return row_idx
 
 
 def update_employee_vector(employee_id: int, db: Session) -> int:
@@ -124,67 +598,160 @@ def update_employee_vector(employee_id: int, db: Session) -> int:
     (Re)compute the embedding for a single employee and upsert it into
     the FAISS employee index.  Returns the FAISS row index assigned.
     """
-    employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+    employee = db.get(models.Employee, employee_id)
     if not employee:
         raise ValueError(f"Employee {employee_id} not found")
 
-    index = _load_or_create_index(EMPLOYEE_INDEX_PATH)
-    vec = generate_employee_embedding(employee)
-    if not FAISS_AVAILABLE:
-        employee.embedding_index = 0
-        db.commit()
-        return 0
-    if employee.embedding_index is not None:
-        pass
-    row_idx = index.ntotal
-    index.add(vec)
-    _save_index(index, EMPLOYEE_INDEX_PATH)
-    employee.embedding_index = row_idx
+    row_idx = update_employee_vector_by_obj(employee, db)
     db.commit()
     return row_idx
 
 
+def update_project_vector_by_obj(project: models.Project, db: Session) -> int:
+    """
+    Embed an already-loaded project and append the vector to the FAISS
+    project index. Does not commit; returns the FAISS row index assigned.
+    """
+    vec = generate_project_embedding(project)
+    row_idx = _append_vectors(PROJECT_INDEX_PATH, vec) if FAISS_AVAILABLE else 0
+    project.embedding_reference = row_idx
+    project.embedding_hash = _content_hash(_project_to_text(project))
+    return row_idx
+
+
 def update_project_vector(project_id: int, db: Session) -> int:
     """
     (Re)compute the embedding for a project and store it in the FAISS
     project index.  Returns the assigned FAISS row index.
     """
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = db.get(models.Project, project_id)
     if not project:
         raise ValueError(f"Project {project_id} not found")
 
-    index = _load_or_create_index(PROJECT_INDEX_PATH)
-    vec = generate_project_embedding(project)
-    if not FAISS_AVAILABLE:
-        project.embedding_reference = 0
-        db.commit()
-        return 0
-    row_idx = index.ntotal
-    index.add(vec)
-    _save_index(index, PROJECT_INDEX_PATH)
-    project.embedding_reference = row_idx
+    row_idx = update_project_vector_by_obj(project, db)
     db.commit()
     return row_idx
 
 
+# kind → (model, batch embedder, index path, column holding the FAISS row)
+_EMBED_TARGETS = {
+    "employee": (models.Employee, generate_employee_embeddings, EMPLOYEE_INDEX_PATH, "embedding_index"),
+    "project": (models.Project, generate_project_embeddings, PROJECT_INDEX_PATH, "embedding_reference"),
+}
+_EMBED_TEXT = {"employee": _employee_to_text, "project": _project_to_text}
+
+
+def update_vectors_batch(kind: str, ids: List[int], db: Session) -> Dict[int, int]:
+    """
+    Embed many employees or projects at once: one encoder forward pass, one
+    FAISS append and one index write, then a single commit. Rows whose
+    embedding text is unchanged (embedding_hash) keep their vector.
+    Returns {object id: FAISS row index}; unknown ids are skipped.
+    """
+    model_cls = _EMBED_TARGETS[kind][0]
+    rows = db.query(model_cls).filter(model_cls.id.in_(ids)).all()
+    return _embed_rows(kind, rows, db)
+
+
+def reindex_all(kind: str, db: Session, force: bool = False, processes: Optional[int] = None) -> int:
+    """
+    Re-embed every employee or project in `db` (bulk reindex / migration):
+    one batched encode, one FAISS append and index write, one commit —
+    instead of an fsync and an index save per row. Rows whose embedding
+    text is unchanged are skipped unless `force`. Encoding is spread over
+    `processes` worker processes (default settings.embedding_processes).
+    Returns the row count.
+    """
+    model_cls = _EMBED_TARGETS[kind][0]
+    rows = db.scalars(select(model_cls).order_by(model_cls.id)).all()
+    if processes is None:
+        processes = settings.embedding_processes
+    return len(_embed_rows(kind, rows, db, force, processes))
+
+
+def _embed_rows(
+    kind: str, rows: list, db: Session, force: bool = False, processes: int = 1
+) -> Dict[int, int]:
+    _, embed, path, column = _EMBED_TARGETS[kind]
+    if not rows:
+        return {}
+
+    hashes = {r.id: _content_hash(_EMBED_TEXT[kind](r)) for r in rows}
+    ntotal = None
+    if FAISS_AVAILABLE:
+        with _get_index_store(path).reading() as index:
+            ntotal = index.ntotal
+    # A matching hash only counts if the row it points at still exists
+    stale = [
+        r for r in rows
+        if force
+        or r.embedding_hash != hashes[r.id]
+        or getattr(r, column) is None
+        or (ntotal is not None and getattr(r, column) >= ntotal)
+    ]
+    assigned = {r.id: getattr(r, column) for r in rows}
+    if stale:
+        if processes > 1:
+            vecs = _encode_parallel([_EMBED_TEXT[kind](r) for r in stale], processes)
+        else:
+            vecs = embed(stale)
+        if FAISS_AVAILABLE:
+            start = _append_vectors(path, vecs)
+            assigned.update({r.id: start + i for i, r in enumerate(stale)})
+        else:
+            assigned.update({r.id: 0 for r in stale})
+
+        for r in stale:
+            setattr(r, column, assigned[r.id])
+            r.embedding_hash = hashes[r.id]
+    if kind == "employee":
+        # Independent of the hash check: a member who changed team keeps the
+        # same text (and row) but still belongs in their new team's vector
+        db.flush()
+        refresh_team_embeddings({r.team_id for r in rows if r.team_id is not None}, db)
+    db.commit()
+    return assigned
+
+
+def process_embedding_batch(kind: str, ids: List[int], bind) -> Dict[int, int]:
+    """
+    Embedding-queue worker entry point: runs update_vectors_batch in its own
+    Session. Project rows carry embedding_reference in the cached project
+    list, so that tenant's entry is dropped once the batch has committed.
+    """
+    db = Session(bind=bind, autoflush=False)
+    try:
+        assigned = update_vectors_batch(kind, ids, db)
+        if kind == "project":
+            invalidate_from_thread(tenant_cache_key(db, "projects"))
+        return assigned
+    finally:
+        db.close()
+
+
 def get_employee_vector(embedding_index: int) -> Optional[np.ndarray]:
     """Retrieve employee embedding vector from FAISS by row index."""
-    index = _load_or_create_index(EMPLOYEE_INDEX_PATH)
     if not FAISS_AVAILABLE:
         return np.zeros((1, EMBEDDING_DIM), dtype=np.float32)
-    if embedding_index is None or embedding_index >= index.ntotal:
-        return None
-    return index.reconstruct(embedding_index).reshape(1, -1)
+    return _reconstruct(EMPLOYEE_INDEX_PATH, embedding_index)
 
 
 def get_project_vector(embedding_reference: int) -> Optional[np.ndarray]:
     """Retrieve project embedding vector from FAISS by row index."""
-    index = _load_or_create_index(PROJECT_INDEX_PATH)
     if not FAISS_AVAILABLE:
         return np.zeros((1, EMBEDDING_DIM), dtype=np.float32)
-    if embedding_reference is None or embedding_reference >= index.ntotal:
-        return None
-    return index.reconstruct(embedding_reference).reshape(1, -1)
+    return _reconstruct(PROJECT_INDEX_PATH, embedding_reference)
+
+
+def pack_team_embedding(vec: np.ndarray) -> bytes:
+    """Team.embedding blob: the unit vector as float16 (768 bytes)."""
+    return vec.astype(np.float16).tobytes()
+
+
+def unpack_team_embedding(blob: bytes) -> np.ndarray:
+    """Decode a Team.embedding blob to float32; blobs written as float32 still load."""
+    dtype = np.float32 if len(blob) == EMBEDDING_DIM * 4 else np.float16
+    return np.frombuffer(blob, dtype=dtype).astype(np.float32)
 
 
 def get_team_embedding(team_id: int, db: Session) -> Optional[np.ndarray]:
@@ -192,36 +759,101 @@ def get_team_embedding(team_id: int, db: Session) -> Optional[np.ndarray]:
     Compute weighted average embedding for a team.
     Team lead weight = 1.5; all other members weight = 1.0.
     Returns normalised 384-dim vector or None if team has no embeddings.
+    Uses the stored Team.embedding when present.
     """
     team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
+    if team is not None and team.embedding is not None:
+        return unpack_team_embedding(team.embedding).reshape(1, -1)
     if not team or not team.members:
         return None
+    vec = get_team_embeddings([team])
+    return vec if vec.any() else None
 
-    weighted_sum = np.zeros((1, EMBEDDING_DIM), dtype=np.float32)
-    total_weight = 0.0
 
-    for member in team.members:
-        if member.embedding_index is None:
-            continue
-        vec = get_employee_vector(member.embedding_index)
-        if vec is None:
-            continue
-        weight = 1.5 if member.id == team.team_lead_id else 1.0
-        weighted_sum += weight * vec
-        total_weight += weight
+def get_team_embeddings(teams: List[models.Team]) -> np.ndarray:
+    """
+    Team embeddings for many teams at once, weighted as in get_team_embedding.
+    Member vectors are gathered in one fancy-index of the employee matrix
+    (memmap), and the weighted sums are accumulated with NumPy rather than per member.
+    Returns an (n_teams, 384) float32 matrix of unit rows; teams without any
+    indexed members get a zero row (similarity 0 to everything).
+    """
+    rows, weights, owners = [], [], []
+    for i, team in enumerate(teams):
+        for member in team.members or []:
+            if member.embedding_index is None:
+                continue
+            rows.append(member.embedding_index)
+            weights.append(1.5 if member.id == team.team_lead_id else 1.0)
+            owners.append(i)
 
-    if total_weight == 0:
-        return None
+    team_mat = np.zeros((len(teams), EMBEDDING_DIM), dtype=np.float32)
+    if not rows or not FAISS_AVAILABLE:
+        return team_mat
 
-    averaged = weighted_sum / total_weight
-    return _normalize(averaged)
+    rows = np.asarray(rows, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float32)
+    owners = np.asarray(owners, dtype=np.int64)
+    vecs, present = _gather_rows(EMPLOYEE_INDEX_PATH, rows)
+    np.add.at(team_mat, owners[present], vecs * weights[present, None])
+
+    return _normalize(team_mat)
+
+
+def stored_team_embeddings(teams: List[models.Team]) -> np.ndarray:
+    """
+    Like get_team_embeddings, but reads each team's precomputed
+    Team.embedding and only aggregates member vectors for teams without one.
+    """
+    team_mat = np.zeros((len(teams), EMBEDDING_DIM), dtype=np.float32)
+    missing = []
+    for i, team in enumerate(teams):
+        if team.embedding is not None:
+            team_mat[i] = unpack_team_embedding(team.embedding)
+        else:
+            missing.append(i)
+    if missing:
+        team_mat[missing] = get_team_embeddings([teams[i] for i in missing])
+    return team_mat
+
+
+def refresh_team_embeddings(team_ids: Iterable[int], db: Session) -> None:
+    """
+    Recompute and store Team.embedding for the given teams from their
+    members' current vectors. Called whenever a member's vector, team or
+    the team's lead changes (for a move, both the old and the new team);
+    the caller flushes pending changes first and commits.
+    """
+    team_ids = list(team_ids)
+    if not team_ids:
+        return
+    # populate_existing: member lists loaded before a move are re-read
+    teams = db.scalars(
+        select(models.Team)
+        .where(models.Team.team_id.in_(team_ids))
+        .options(selectinload(models.Team.members))
+        .execution_options(populate_existing=True)
+    ).all()
+    for team, vec in zip(teams, get_team_embeddings(teams)):
+        # Teams without indexed members keep NULL (similarity 0 either way)
+        team.embedding = pack_team_embedding(vec) if vec.any() else None
+
+
+def dot_unit(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
+    """
+    Cosine similarity of two vectors that are already unit length (index
+    rows, team embeddings): a plain dot product, no re-normalisation.
+    """
+    return float(np.dot(vec_a.reshape(-1), vec_b.reshape(-1)))
 
 
 def compute_cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
     """
-    Cosine similarity between two normalised vectors (dot product = cosine for unit vecs).
-    Returns a float in [0, 1].
+    Cosine similarity between two arbitrary vectors; both are normalised first.
+    Prefer dot_unit when the inputs are known to be unit length.
     """
-    vec_a = _normalize(vec_a.reshape(1, -1))
-    vec_b = _normalize(vec_b.reshape(1, -1))
-    return float(np.dot(vec_a, vec_b.T)[0, 0])
+    # Three 1-D dots (BLAS sdot) instead of normalised copies and a 1x1 matmul
+    a = vec_a.ravel().astype(np.float32, copy=False)
+    b = vec_b.ravel().astype(np.float32, copy=False)
+    denom = np.sqrt(float(np.dot(a, a)) * float(np.dot(b, b)))
+    return float(np.dot(a, b)) / denom if denom > 0 else 0.0
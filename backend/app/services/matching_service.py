@@ -8,16 +8,22 @@ Implements the core hybrid scoring formula:
               + 0.1*team_balance
 """
 
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session, joinedload
+import heapq
+from typing import List, Dict, Any, FrozenSet, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer
 
 from app import models
 from app.services.embedding_service import (
-    get_team_embedding,
+    _normalize,
+    stored_team_embeddings,
     get_project_vector,
-    compute_cosine_similarity,
+    dot_unit,
     generate_employee_embedding,
     get_employee_vector,
+    search_vectors,
+    PROJECT_INDEX_PATH,
 )
 
 
@@ -30,13 +36,20 @@ def _skill_coverage(required: List[str], team_skills: List[str]) -> float:
     Fraction of required skills covered by the team.
     |required ∩ team_skills| / |required|
     Returns 0.0 if no skills are required.
+    Skills are stored lowercased (models.normalize_skills).
     """
     if not required:
         return 1.0
-    required_lower = {s.lower() for s in required}
-    team_lower = {s.lower() for s in team_skills}
-    covered = required_lower & team_lower
-    return len(covered) / len(required_lower)
+    required_set = set(required)
+    covered = required_set & set(team_skills)
+    return len(covered) / len(required_set)
+
+
+def _skill_coverage_fast(required: FrozenSet[str], team_skills: FrozenSet[str]) -> float:
+    """_skill_coverage on precomputed skill sets."""
+    if not required:
+        return 1.0
+    return len(required & team_skills) / len(required)
 
 
 def _experience_match(avg_experience: float, required: float) -> float:
@@ -60,7 +73,7 @@ def _team_balance(members: List[models.Employee]) -> float:
 
     all_skills = []
     for m in members:
-        all_skills.extend([s.lower() for s in (m.skills or [])])
+        all_skills.extend(m.skills or [])
 
     if not all_skills:
         return 0.5
@@ -69,57 +82,59 @@ def _team_balance(members: List[models.Employee]) -> float:
     return min(unique_ratio, 1.0)
 
 
-def _embedding_similarity(team_id: int, project: models.Project, db: Session) -> float:
+class _TeamFeatures(NamedTuple):
+    """Project-independent inputs to the hybrid score, derived from a team's members."""
+    skills: FrozenSet[str]      # union of member skills
+    balance: float              # _team_balance(members)
+    avg_experience: float
+
+
+def _team_features(members: List[models.Employee]) -> _TeamFeatures:
+    """Collect member skills once and derive coverage, balance and experience inputs."""
+    all_skills = [s for m in members for s in (m.skills or [])]
+    skills = frozenset(all_skills)
+    balance = min(len(skills) / len(all_skills), 1.0) if all_skills else 0.5
+    avg_exp = sum(m.experience for m in members) / len(members) if members else 0.0
+    return _TeamFeatures(skills, balance, avg_exp)
+
+
+def _embedding_similarity(team: models.Team, project: models.Project) -> float:
     """Cosine similarity between team embedding and project embedding."""
     if project.embedding_reference is None:
         return 0.0
 
-    team_vec = get_team_embedding(team_id, db)
-    if team_vec is None:
-        return 0.0
-
     proj_vec = get_project_vector(project.embedding_reference)
     if proj_vec is None:
         return 0.0
 
-    return compute_cosine_similarity(team_vec, proj_vec)
+    # Stored or rebuilt from the loaded members; a zero row means no embeddings.
+    # Both are already normalised.
+    return dot_unit(stored_team_embeddings([team]), proj_vec)
 
 
 # ─────────────────────────────────────────────────────────────
 # Main scoring function
 # ─────────────────────────────────────────────────────────────
 
-def calculate_team_score(team_id: int, project_id: int, db: Session) -> Dict[str, float]:
+def _score_team(
+    team: models.Team,
+    project: models.Project,
+    emb_sim: float,
+    required: Optional[FrozenSet[str]] = None,
+) -> Dict[str, float]:
     """
-    Calculate the full hybrid score for a team against a project.
-    Returns a dict with all component scores and the final score.
+    Combine the embedding similarity with the team/project-derived components.
+    `required` lets callers scoring many teams build the project's
+    required-skill set once.
     """
-    team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
-    if not team:
-        raise ValueError(f"Team {team_id} not found")
-
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project:
-        raise ValueError(f"Project {project_id} not found")
-
-    members = team.members or []
-
-    # Aggregate team skills (union)
-    team_skills: List[str] = []
-    for m in members:
-        team_skills.extend(m.skills or [])
-
-    # Average experience
-    avg_exp = (
-        sum(m.experience for m in members) / len(members)
-        if members else 0.0
-    )
+    if required is None:
+        required = frozenset(project.required_skills or [])
+    features = _team_features(team.members or [])
 
     # Compute components
-    emb_sim = _embedding_similarity(team_id, project, db)
-    skill_cov = _skill_coverage(project.required_skills or [], team_skills)
-    exp_match = _experience_match(avg_exp, project.required_experience)
-    t_balance = _team_balance(members)
+    skill_cov = _skill_coverage_fast(required, features.skills)
+    exp_match = _experience_match(features.avg_experience, project.required_experience)
+    t_balance = features.balance
 
     # Weighted formula (DO NOT MODIFY)
     final = (
@@ -130,8 +145,8 @@ def calculate_team_score(team_id: int, project_id: int, db: Session) -> Dict[str
     )
 
     return {
-        "team_id": team_id,
-        "project_id": project_id,
+        "team_id": team.team_id,
+        "project_id": project.id,
         "final_score": round(final, 4),
         "embedding_similarity": round(emb_sim, 4),
         "skill_coverage": round(skill_cov, 4),
@@ -140,32 +155,76 @@ def calculate_team_score(team_id: int, project_id: int, db: Session) -> Dict[str
     }
 
 
+def calculate_team_score(team_id: int, project_id: int, db: Session) -> Dict[str, float]:
+    """
+    Calculate the full hybrid score for a team against a project.
+    Returns a dict with all component scores and the final score.
+    """
+    # Members and the stored embedding are loaded up front: one SELECT ... IN
+    # instead of a lazy load, and no second lookup of the team for its vector
+    team = db.get(
+        models.Team, team_id,
+        options=[selectinload(models.Team.members), undefer(models.Team.embedding)],
+    )
+    if not team:
+        raise ValueError(f"Team {team_id} not found")
+
+    project = db.get(models.Project, project_id)
+    if not project:
+        raise ValueError(f"Project {project_id} not found")
+
+    return _score_team(team, project, _embedding_similarity(team, project))
+
+
 # ─────────────────────────────────────────────────────────────
 # Ranking helpers
 # ─────────────────────────────────────────────────────────────
 
-def rank_teams(project_id: int, db: Session) -> List[Dict[str, Any]]:
+def rank_teams(project_id: int, db: Session, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Score every team against the given project and return them sorted
-    by final_score descending.
+    by final_score descending (only the best `limit` when given).
+    Team embeddings come precomputed from Team.embedding (missing ones are
+    built in one batch, see stored_team_embeddings) and are scored against the project with a single matrix-vector product;
+    calculate_team_score remains the single-team path.
     """
-    teams = db.query(models.Team).options(joinedload(models.Team.members)).all()
+    project = db.get(models.Project, project_id)
+    if not project:
+        return []
+    teams = (
+        db.query(models.Team)
+        .options(joinedload(models.Team.members), undefer(models.Team.embedding))
+        .all()
+    )
+
+    sims = np.zeros(len(teams), dtype=np.float32)
+    proj_vec = None
+    if project.embedding_reference is not None:
+        proj_vec = get_project_vector(project.embedding_reference)
+    if proj_vec is not None and teams:
+        # Team rows are unit length; normalising the project makes the dot a cosine
+        sims = stored_team_embeddings(teams) @ _normalize(proj_vec)[0]
+
+    required = frozenset(project.required_skills or [])
     results = []
-    for team in teams:
+    for team, emb_sim in zip(teams, sims.tolist()):
         try:
-            score_data = calculate_team_score(team.team_id, project_id, db)
+            score_data = _score_team(team, project, emb_sim, required)
             score_data["team_name"] = team.team_name
             results.append(score_data)
         except Exception:
             continue  # Skip teams with data issues
 
+    if limit is not None:
+        # Partial selection instead of sorting every team
+        return heapq.nlargest(limit, results, key=lambda x: x["final_score"])
     results.sort(key=lambda x: x["final_score"], reverse=True)
     return results
 
 
 def get_top_5_teams(project_id: int, db: Session) -> List[Dict[str, Any]]:
     """Return the top 5 teams for a project."""
-    return rank_teams(project_id, db)[:5]
+    return rank_teams(project_id, db, limit=5)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -175,7 +234,8 @@ def get_top_5_teams(project_id: int, db: Session) -> List[Dict[str, Any]]:
 def get_top_5_projects_for_employee(employee_id: int, db: Session) -> List[Dict[str, Any]]:
     """
     Find Top 5 projects that best match a single employee.
-    Uses individual employee embedding vs project embedding + skill gap.
+    Uses individual employee embedding vs project embedding + skill gap; the
+    similarity search runs over the FAISS project index (see search_vectors).
     """
     employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
     if not employee:
@@ -188,22 +248,16 @@ def get_top_5_projects_for_employee(employee_id: int, db: Session) -> List[Dict[
     if emp_vec is None:
         return []
 
-    projects = db.query(models.Project).all()
-    results = []
-    for project in projects:
-        if project.embedding_reference is None:
-            continue
-
-        proj_vec = get_project_vector(project.embedding_reference)
-        if proj_vec is None:
-            continue
-
-        sim = compute_cosine_similarity(emp_vec, proj_vec)
+    projects = db.query(models.Project).filter(models.Project.embedding_reference.isnot(None)).all()
+    by_row = {p.embedding_reference: p for p in projects}
+    top = search_vectors(PROJECT_INDEX_PATH, emp_vec, list(by_row), k=5)
 
+    emp_skills = set(employee.skills or [])
+    results = []
+    for row, sim in top:
+        project = by_row[row]
         # Skill gap: required skills this employee lacks
-        emp_skills_lower = {s.lower() for s in (employee.skills or [])}
-        req_skills_lower = {s.lower() for s in (project.required_skills or [])}
-        missing = [s for s in project.required_skills if s.lower() not in emp_skills_lower]
+        missing = [s for s in (project.required_skills or []) if s not in emp_skills]
 
         results.append({
             "project_id": project.id,
@@ -215,5 +269,4 @@ def get_top_5_projects_for_employee(employee_id: int, db: Session) -> List[Dict[
             "skill_gap": missing,
         })
 
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results[:5]
+    return results
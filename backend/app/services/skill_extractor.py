@@ -0,0 +1,76 @@
+"""
+skill_extractor.py
+Keyword-based skill extraction for resume parsing.
+
+Resume text is scanned against a curated vocabulary (skills.txt) using
+spaCy's PhraseMatcher.  Only the blank English tokenizer is needed — no
+statistical model — so a scan is O(text length) regardless of vocabulary size.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+SKILLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.txt")
+
+# Entries this short ("C", "R", "Go", "Git") collide with ordinary words when
+# matched case-insensitively, so they must match the vocabulary spelling exactly.
+_EXACT_CASE_MAX_LEN = 3
+
+_matcher_state: Optional[Tuple] = None
+
+
+def load_skill_vocabulary(path: str = SKILLS_FILE) -> List[str]:
+    """Read the skill vocabulary, skipping comments and case-insensitive duplicates."""
+    seen = set()
+    skills = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            skill = line.strip()
+            if not skill or skill.startswith("#") or skill.lower() in seen:
+                continue
+            seen.add(skill.lower())
+            skills.append(skill)
+    return skills
+
+
+def _get_matcher():
+    """Lazy-build the tokenizer + phrase matchers (once per process)."""
+    global _matcher_state
+    if _matcher_state is None:
+        import spacy
+        from spacy.matcher import PhraseMatcher
+
+        nlp = spacy.blank("en")
+        exact = PhraseMatcher(nlp.vocab, attr="ORTH")
+        folded = PhraseMatcher(nlp.vocab, attr="LOWER")
+        canonical: Dict[int, str] = {}
+
+        for skill in load_skill_vocabulary():
+            matcher = exact if len(skill) <= _EXACT_CASE_MAX_LEN else folded
+            match_id = nlp.vocab.strings.add(skill)
+            canonical[match_id] = skill
+            matcher.add(skill, [nlp.make_doc(skill)])
+
+        _matcher_state = (nlp, exact, folded, canonical)
+    return _matcher_state
+
+
+def extract_skills(text: str, limit: int = 30) -> List[str]:
+    """
+    Return vocabulary skills mentioned in `text`, in order of first
+    appearance, using the vocabulary's canonical spelling.
+    """
+    nlp, exact, folded, canonical = _get_matcher()
+    doc = nlp.make_doc(text)
+    matches = sorted(exact(doc) + folded(doc), key=lambda m: m[1])
+
+    found: List[str] = []
+    seen = set()
+    for match_id, _start, _end in matches:
+        skill = canonical[match_id]
+        if skill not in seen:
+            seen.add(skill)
+            found.append(skill)
+            if len(found) >= limit:
+                break
+    return found
@@ -2,10 +2,12 @@
 team_service.py - Business logic for team-level operations.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app import models
+from app.pagination import PageParams, keyset_page, split_page
 
 
 def get_team_members(team_id: int, db: Session) -> List[models.Employee]:
@@ -16,6 +18,20 @@ def get_team_members(team_id: int, db: Session) -> List[models.Employee]:
     return team.members or []
 
 
+def get_team_members_page(
+    team_id: int, db: Session, page: PageParams
+) -> Tuple[List[models.Employee], Optional[int]]:
+    """One keyset page of a team's members (by employee id) and the next cursor."""
+    if db.get(models.Team, team_id) is None:
+        raise ValueError(f"Team {team_id} not found")
+    stmt = keyset_page(
+        select(models.Employee).where(models.Employee.team_id == team_id),
+        models.Employee.id,
+        page,
+    )
+    return split_page(db.scalars(stmt).all(), page, lambda e: e.id)
+
+
 def get_team_skill_heatmap(team_id: int, db: Session) -> Dict[str, Any]:
     """
     Build data for the skill heatmap visualisation.
@@ -29,7 +45,7 @@ def get_team_skill_heatmap(team_id: int, db: Session) -> Dict[str, Any]:
 
     for member in members:
         skills = member.skills or []
-        all_skills.update(s.lower() for s in skills)
+        all_skills.update(skills)
         employees_data.append({
             "employee_name": member.name,
             "skills": skills,
@@ -51,11 +67,11 @@ def get_individual_skill_gap(employee_id: int, project_id: int, db: Session) ->
     if not employee or not project:
         raise ValueError("Employee or project not found")
 
-    emp_skills = {s.lower() for s in (employee.skills or [])}
+    emp_skills = set(employee.skills or [])
     req_skills = project.required_skills or []
 
-    missing = [s for s in req_skills if s.lower() not in emp_skills]
-    covered = [s for s in req_skills if s.lower() in emp_skills]
+    missing = [s for s in req_skills if s not in emp_skills]
+    covered = [s for s in req_skills if s in emp_skills]
 
     return {
         "employee_id": employee_id,
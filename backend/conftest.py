@@ -14,9 +14,12 @@ from sqlalchemy.pool import StaticPool
 # Add app to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# The login bucket (10/min) is shared by every test in the session
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 from app.database import Base, get_db, get_db_for_hr
 from app.main import app
-from app.auth import hash_password, create_access_token
+from app.auth import hash_password, create_access_token, _principal_cache
 from app import models
 
 
@@ -47,6 +50,7 @@ def override_get_db():
 def db() -> Generator:
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=test_engine)
+    _principal_cache.clear()
     db = TestSessionLocal()
     try:
         yield db
@@ -67,6 +71,25 @@ def client(db) -> Generator:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def tmp_index(tmp_path, monkeypatch):
+    """
+    Factory: tmp_index("employee" | "project") points that kind's FAISS index
+    (module path and embedding target) at a file under tmp_path and returns it.
+    """
+    from app.services import embedding_service
+    
+    def redirect(kind: str) -> str:
+        path = str(tmp_path / f"{kind}.index")
+        attr = "EMPLOYEE_INDEX_PATH" if kind == "employee" else "PROJECT_INDEX_PATH"
+        monkeypatch.setattr(embedding_service, attr, path)
+        target = embedding_service._EMBED_TARGETS[kind]
+        monkeypatch.setitem(embedding_service._EMBED_TARGETS, kind, target[:2] + (path, target[3]))
+        return path
+    
+    return redirect
+
+
 @pytest.fixture
 def sample_employee(db) -> models.Employee:
     """Create a sample employee for testing."""
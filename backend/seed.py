@@ -1,47 +1,142 @@
 """
 seed.py - Populates the database with realistic dummy data for testing.
-Run with:  python seed.py   (from the backend/ directory)
+Run with:  python seed.py [--reset]   (from the backend/ directory)
+
+Seeding is idempotent: rows are upserted on their natural keys (emp_id,
+team_code, project title), so re-running updates the demo data in place and
+re-embeds only rows whose text changed. --reset drops and recreates every
+table first.
 """
 
+import csv
+import io
+import json
 import sys
 import os
+import sqlite3
+from functools import lru_cache
 
 # Ensure app module is importable from backend/
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app.database import SessionLocal, engine, Base
+from sqlalchemy import JSON, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import SessionLocal, engine, Base, create_schema, dispose_hr_db, hr_db_path
 from app import models
 from app.auth import hash_password
-from app.services.embedding_service import update_employee_vector, update_project_vector
+from app.config import settings
+from app.services.embedding_service import reindex_all
+
+# Rows are written as plain dicts with ORM bulk INSERT: one executemany
+# INSERT (or upsert) per table inside a single transaction, no per-row
+# flush/commit/refresh.
+# Bulk inserts skip ORM validators, so skills are normalised here.
+
 
-# Reset all tables
-Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
+# bcrypt is deliberately slow and every seeded account shares one of two
+# passwords: hash each distinct password once and reuse the digest (the salt
+# is embedded in it, so any copy verifies). The demo passwords are printed
+# below anyway, so they are hashed at SEED_BCRYPT_ROUNDS (default 4) rather
+# than the production cost; verify_password reads the cost from the hash.
+@lru_cache(maxsize=None)
+def hash_seed_password(plain):
+    return hash_password(plain, rounds=settings.seed_bcrypt_rounds)
 
-db = SessionLocal()
 
-print("🌱 Seeding database...")
+def relax_durability(db):
+    """
+    Seed data is disposable, so skip the per-commit fsync: SQLite's
+    synchronous setting lasts for the (single, StaticPool) connection and
+    so also covers the embedding commits; PostgreSQL's only this transaction.
+    """
+    if engine.dialect.name == "sqlite":
+        db.execute(text("PRAGMA synchronous = OFF"))
+    elif engine.dialect.name == "postgresql":
+        db.execute(text("SET LOCAL synchronous_commit = OFF"))
+
+
+def bulk_insert(db, model, rows, key):
+    """INSERT ... RETURNING all rows at once and store the generated keys on the dicts."""
+    ids = db.scalars(insert(model).returning(key, sort_by_parameter_order=True), rows).all()
+    for row, pk in zip(rows, ids):
+        row[key.key] = pk
+
+
+def upsert(db, model, rows, key, conflict):
+    """
+    bulk_insert as INSERT ... ON CONFLICT (conflict) DO UPDATE: rows already
+    present (by the unique `conflict` column) are updated in place and their
+    existing keys returned, so a reseed never duplicates them.
+    """
+    dialect_insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[conflict],
+        set_={name: stmt.excluded[name] for name in rows[0] if name != conflict},
+    )
+    ids = db.scalars(stmt.returning(key, sort_by_parameter_order=True), rows).all()
+    for row, pk in zip(rows, ids):
+        row[key.key] = pk
+
+
+def copy_insert(db, model, rows, key, natural_key):
+    """
+    PostgreSQL only: stream rows through COPY ... FROM STDIN (CSV) on the
+    session's own connection, then read the generated keys back in one
+    SELECT matched on a unique `natural_key` (COPY cannot RETURNING).
+    COPY bypasses Python-side column defaults, so scalar ones are filled in.
+    """
+    table = model.__table__
+    columns = list(rows[0])
+    columns += [
+        c.key for c in table.columns
+        if c.key not in columns and c.default is not None and c.default.is_scalar
+    ]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        record = []
+        for name in columns:
+            column = table.columns[name]
+            value = row.get(name, column.default.arg if column.default is not None else None)
+            if value is None:
+                record.append("")  # unquoted empty field is NULL in CSV COPY
+            elif isinstance(column.type, JSON):
+                record.append(json.dumps(value))
+            else:
+                record.append(value)
+        writer.writerow(record)
+    buf.seek(0)
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf
+        )
+    keys = dict(db.execute(
+        select(natural_key, key).where(natural_key.in_([row[natural_key.key] for row in rows]))
+    ).all())
+    for row in rows:
+        row[key.key] = keys[row[natural_key.key]]
+
 
 # ─────────────────────────────────────────────────────────────
 # HR User
 # ─────────────────────────────────────────────────────────────
-hr_user = models.Employee(
-    emp_id="HR001",
-    username="hr_admin",
-    name="Priya Sharma",
-    email="hr@klh.com",
-    password_hash=hash_password("hr123"),
-    skills=["Recruitment", "Project Management", "HR Analytics"],
-    experience=8.0,
-    projects=["HR Transformation", "Talent Portal"],
-    certifications=["SHRM-CP", "PMP"],
-    role="hr",
-    resume_uploaded=True,
-)
-db.add(hr_user)
-db.commit()
-db.refresh(hr_user)
-print(f"  ✓ HR user: {hr_user.email}")
+HR_PASSWORD = "hr123"
+hr_user = {
+    "emp_id": "HR001",
+    "username": "hr_admin",
+    "name": "Priya Sharma",
+    "email": "hr@klh.com",
+    "password_hash": hash_seed_password(HR_PASSWORD),
+    "skills": models.normalize_skills(["Recruitment", "Project Management", "HR Analytics"]),
+    "experience": 8.0,
+    "projects": ["HR Transformation", "Talent Portal"],
+    "certifications": ["SHRM-CP", "PMP"],
+    "role": "hr",
+    "resume_uploaded": True,
+}
 
 # ─────────────────────────────────────────────────────────────
 # Teams
@@ -51,178 +146,72 @@ teams_data = [
     {"name": "Beta Brains",   "code": "BETA02"},
     {"name": "Gamma Force",  "code": "GAMMA03"},
 ]
-teams = []
-for t in teams_data:
-    team = models.Team(team_name=t["name"], team_code=t["code"])
-    db.add(team)
-    db.commit()
-    db.refresh(team)
-    teams.append(team)
-print(f"  ✓ {len(teams)} teams created")
+teams = [{"team_name": t["name"], "team_code": t["code"]} for t in teams_data]
 
 # ─────────────────────────────────────────────────────────────
 # Employees per team
 # ─────────────────────────────────────────────────────────────
-employees_data = [
+# Every seeded employee shares one password; each row is one employee's
+# EMPLOYEE_COLUMNS values followed by the index of their team in teams_data.
+EMPLOYEE_PASSWORD = "pass123"
+EMPLOYEE_COLUMNS = (
+    "emp_id", "username", "name", "email", "skills", "experience",
+    "projects", "certifications", "role",
+)
+EMPLOYEE_ROWS = [
     # ── Alpha Squad ─────────────────────────────────────────────
-    {
-        "emp_id": "LEAD001", "username": "arjun_lead",
-        "name": "Arjun Patel", "email": "arjun@klh.com", "password": "pass123",
-        "skills": ["Python", "FastAPI", "Machine Learning", "PostgreSQL", "Docker"],
-        "experience": 5.0,
-        "projects": ["Recommendation Engine", "Data Pipeline"],
-        "certifications": ["AWS Certified Developer", "TensorFlow Developer"],
-        "role": "team_lead",
-        "team_idx": 0,
-    },
-    {
-        "emp_id": "EMP001", "username": "meera_dev",
-        "name": "Meera Krishnan", "email": "meera@klh.com", "password": "pass123",
-        "skills": ["React", "TypeScript", "Tailwind CSS", "Next.js", "GraphQL"],
-        "experience": 3.5,
-        "projects": ["E-commerce UI", "Admin Dashboard"],
-        "certifications": ["Meta Frontend Developer"],
-        "role": "employee",
-        "team_idx": 0,
-    },
-    {
-        "emp_id": "EMP002", "username": "rohit_analyst",
-        "name": "Rohit Singh", "email": "rohit@klh.com", "password": "pass123",
-        "skills": ["Python", "Data Analysis", "Pandas", "NumPy", "Tableau"],
-        "experience": 4.0,
-        "projects": ["Sales Analytics", "Financial Reporting"],
-        "certifications": ["Google Data Analytics"],
-        "role": "employee",
-        "team_idx": 0,
-    },
-    {
-        "emp_id": "EMP003", "username": "kavya_nlp",
-        "name": "Kavya Reddy", "email": "kavya@klh.com", "password": "pass123",
-        "password": "pass123",
-        "skills": ["NLP", "spaCy", "BERT", "Python", "scikit-learn"],
-        "experience": 2.5,
-        "projects": ["Chatbot", "Sentiment Analysis Tool"],
-        "certifications": ["Hugging Face NLP"],
-        "role": "employee",
-        "team_idx": 0,
-    },
+    ("LEAD001", "arjun_lead", "Arjun Patel", "arjun@klh.com",
+     ["Python", "FastAPI", "Machine Learning", "PostgreSQL", "Docker"],
+     5.0, ["Recommendation Engine", "Data Pipeline"],
+     ["AWS Certified Developer", "TensorFlow Developer"], "team_lead", 0),
+    ("EMP001", "meera_dev", "Meera Krishnan", "meera@klh.com",
+     ["React", "TypeScript", "Tailwind CSS", "Next.js", "GraphQL"],
+     3.5, ["E-commerce UI", "Admin Dashboard"],
+     ["Meta Frontend Developer"], "employee", 0),
+    ("EMP002", "rohit_analyst", "Rohit Singh", "rohit@klh.com",
+     ["Python", "Data Analysis", "Pandas", "NumPy", "Tableau"],
+     4.0, ["Sales Analytics", "Financial Reporting"],
+     ["Google Data Analytics"], "employee", 0),
+    ("EMP003", "kavya_nlp", "Kavya Reddy", "kavya@klh.com",
+     ["NLP", "spaCy", "BERT", "Python", "scikit-learn"],
+     2.5, ["Chatbot", "Sentiment Analysis Tool"],
+     ["Hugging Face NLP"], "employee", 0),
     # ── Beta Brains ──────────────────────────────────────────────
-    {
-        "emp_id": "LEAD002", "username": "sameer_lead",
-        "name": "Sameer Nair", "email": "sameer@klh.com", "password": "pass123",
-        "skills": ["Java", "Spring Boot", "Microservices", "Kubernetes", "Kafka"],
-        "experience": 6.0,
-        "projects": ["Payment Gateway", "Order Management System"],
-        "certifications": ["Java SE 11", "CKA"],
-        "role": "team_lead",
-        "team_idx": 1,
-    },
-    {
-        "emp_id": "EMP004", "username": "divya_banking",
-        "name": "Divya Iyer", "email": "divya@klh.com", "password": "pass123",
-        "skills": ["Angular", "Java", "SQL", "REST APIs", "Azure"],
-        "experience": 4.0,
-        "projects": ["Banking Portal", "Loan Management"],
-        "certifications": ["AZ-204"],
-        "role": "employee",
-        "team_idx": 1,
-    },
-    {
-        "emp_id": "EMP005", "username": "kiran_devops",
-        "name": "Kiran Mehta", "email": "kiran@klh.com", "password": "pass123",
-        "skills": ["DevOps", "Terraform", "AWS", "CI/CD", "Docker", "Kubernetes"],
-        "experience": 5.5,
-        "projects": ["Cloud Migration", "Infrastructure Automation"],
-        "certifications": ["AWS Solutions Architect", "Terraform Associate"],
-        "role": "employee",
-        "team_idx": 1,
-    },
-    {
-        "emp_id": "EMP006", "username": "anjali_qa",
-        "name": "Anjali Verma", "email": "anjali@klh.com", "password": "pass123",
-        "skills": ["QA", "Selenium", "Pytest", "Postman", "JIRA"],
-        "experience": 3.0,
-        "projects": ["Regression Suite", "API Testing Framework"],
-        "certifications": ["ISTQB Foundation"],
-        "role": "employee",
-        "team_idx": 1,
-    },
+    ("LEAD002", "sameer_lead", "Sameer Nair", "sameer@klh.com",
+     ["Java", "Spring Boot", "Microservices", "Kubernetes", "Kafka"],
+     6.0, ["Payment Gateway", "Order Management System"],
+     ["Java SE 11", "CKA"], "team_lead", 1),
+    ("EMP004", "divya_banking", "Divya Iyer", "divya@klh.com",
+     ["Angular", "Java", "SQL", "REST APIs", "Azure"],
+     4.0, ["Banking Portal", "Loan Management"],
+     ["AZ-204"], "employee", 1),
+    ("EMP005", "kiran_devops", "Kiran Mehta", "kiran@klh.com",
+     ["DevOps", "Terraform", "AWS", "CI/CD", "Docker", "Kubernetes"],
+     5.5, ["Cloud Migration", "Infrastructure Automation"],
+     ["AWS Solutions Architect", "Terraform Associate"], "employee", 1),
+    ("EMP006", "anjali_qa", "Anjali Verma", "anjali@klh.com",
+     ["QA", "Selenium", "Pytest", "Postman", "JIRA"],
+     3.0, ["Regression Suite", "API Testing Framework"],
+     ["ISTQB Foundation"], "employee", 1),
     # ── Gamma Force ──────────────────────────────────────────────
-    {
-        "emp_id": "LEAD003", "username": "vikram_lead",
-        "name": "Vikram Das", "email": "vikram@klh.com", "password": "pass123",
-        "skills": ["React", "Node.js", "MongoDB", "Express", "Redis"],
-        "experience": 4.5,
-        "projects": ["Social Media App", "Real-time Dashboard"],
-        "certifications": ["MongoDB Developer"],
-        "role": "team_lead",
-        "team_idx": 2,
-    },
-    {
-        "emp_id": "EMP007", "username": "sneha_reports",
-        "name": "Sneha Pillai", "email": "sneha@klh.com", "password": "pass123",
-        "skills": ["Python", "Flask", "SQL", "Power BI", "Excel"],
-        "experience": 2.0,
-        "projects": ["Reporting Tool", "KPI Dashboard"],
-        "certifications": ["Power BI Analyst"],
-        "role": "employee",
-        "team_idx": 2,
-    },
-    {
-        "emp_id": "EMP008", "username": "rahul_fullstack",
-        "name": "Rahul Gupta", "email": "rahul@klh.com", "password": "pass123",
-        "skills": ["React", "Python", "FastAPI", "Docker", "Git"],
-        "experience": 3.0,
-        "projects": ["Student Portal", "Task Manager"],
-        "certifications": ["Docker Certified Associate"],
-        "role": "employee",
-        "team_idx": 2,
-    },
-    {
-        "emp_id": "EMP009", "username": "pooja_ux",
-        "name": "Pooja Nambiar", "email": "pooja@klh.com", "password": "pass123",
-        "skills": ["UI/UX", "Figma", "React", "CSS", "Accessibility"],
-        "experience": 2.5,
-        "projects": ["Design System", "Mobile Redesign"],
-        "certifications": ["Google UX Design"],
-        "role": "employee",
-        "team_idx": 2,
-    },
+    ("LEAD003", "vikram_lead", "Vikram Das", "vikram@klh.com",
+     ["React", "Node.js", "MongoDB", "Express", "Redis"],
+     4.5, ["Social Media App", "Real-time Dashboard"],
+     ["MongoDB Developer"], "team_lead", 2),
+    ("EMP007", "sneha_reports", "Sneha Pillai", "sneha@klh.com",
+     ["Python", "Flask", "SQL", "Power BI", "Excel"],
+     2.0, ["Reporting Tool", "KPI Dashboard"],
+     ["Power BI Analyst"], "employee", 2),
+    ("EMP008", "rahul_fullstack", "Rahul Gupta", "rahul@klh.com",
+     ["React", "Python", "FastAPI", "Docker", "Git"],
+     3.0, ["Student Portal", "Task Manager"],
+     ["Docker Certified Associate"], "employee", 2),
+    ("EMP009", "pooja_ux", "Pooja Nambiar", "pooja@klh.com",
+     ["UI/UX", "Figma", "React", "CSS", "Accessibility"],
+     2.5, ["Design System", "Mobile Redesign"],
+     ["Google UX Design"], "employee", 2),
 ]
 
-created_employees = []
-for emp_data in employees_data:
-    team_idx = emp_data.pop("team_idx")
-    password = emp_data.pop("password")
-    emp = models.Employee(
-        emp_id=emp_data.get("emp_id"),
-        username=emp_data.get("username"),
-        name=emp_data["name"],
-        email=emp_data["email"],
-        password_hash=hash_password(password),
-        skills=emp_data["skills"],
-        experience=emp_data["experience"],
-        projects=emp_data["projects"],
-        certifications=emp_data["certifications"],
-        role=emp_data["role"],
-        team_id=teams[team_idx].team_id,
-        resume_uploaded=True,  # seed data has skills already
-    )
-    db.add(emp)
-    db.commit()
-    db.refresh(emp)
-    created_employees.append((emp, team_idx))
-
-print(f"  ✓ {len(created_employees)} employees created")
-
-# Assign team leads
-for emp, team_idx in created_employees:
-    if emp.role == "team_lead":
-        teams[team_idx].team_lead_id = emp.id
-
-db.commit()
-print("  ✓ Team leads assigned")
-
 # ─────────────────────────────────────────────────────────────
 # Projects
 # ─────────────────────────────────────────────────────────────
@@ -283,55 +272,148 @@ projects_data = [
     },
 ]
 
-created_projects = []
-for proj_data in projects_data:
-    project = models.Project(**proj_data)
-    db.add(project)
-    db.commit()
-    db.refresh(project)
-    created_projects.append(project)
+created_projects = [
+    {**p, "required_skills": models.normalize_skills(p["required_skills"])}
+    for p in projects_data
+]
 
-print(f"  ✓ {len(created_projects)} projects created")
+def main():
+    reset = "--reset" in sys.argv[1:]
+    deferred_indexes = []
+    if reset:
+        # Non-unique secondary indexes are dropped again straight away and
+        # built once after the load, rather than maintained row by row during
+        # it; unique ones stay so duplicate seed rows still fail.
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        deferred_indexes = [
+            ix for table in Base.metadata.sorted_tables for ix in table.indexes if not ix.unique
+        ]
+        for ix in deferred_indexes:
+            ix.drop(bind=engine)
+    else:
+        # Also adds columns/indexes introduced since the DB file was created
+        create_schema(engine)
 
-# ─────────────────────────────────────────────────────────────
-# Generate embeddings for all employees and projects
-# ─────────────────────────────────────────────────────────────
-print("  ⏳ Generating embeddings (this may take a minute on first run)...")
+    db = SessionLocal()
 
-for emp, _ in created_employees:
-    try:
-        update_employee_vector(emp.id, db)
-    except Exception as e:
-        print(f"    ⚠ Embedding failed for {emp.name}: {e}")
+    print("🌱 Seeding database...")
 
-for emp in [hr_user]:
-    try:
-        update_employee_vector(emp.id, db)
-    except Exception as e:
-        print(f"    ⚠ Embedding failed for {emp.name}: {e}")
+    # ─────────────────────────────────────────────────────────────
+    # Insert everything in one transaction
+    # ─────────────────────────────────────────────────────────────
+    with db.begin():
+        relax_durability(db)
+        upsert(db, models.Employee, [hr_user], models.Employee.id, "emp_id")
+        print(f"  ✓ HR user: {hr_user['email']}")
+
+        upsert(db, models.Team, teams, models.Team.team_id, "team_code")
+        print(f"  ✓ {len(teams)} teams seeded")
+
+        created_employees = []
+        for *values, team_idx in EMPLOYEE_ROWS:
+            row = dict(zip(EMPLOYEE_COLUMNS, values))
+            row.update(
+                password_hash=hash_seed_password(EMPLOYEE_PASSWORD),
+                skills=models.normalize_skills(row["skills"]),
+                team_id=teams[team_idx]["team_id"],
+                resume_uploaded=True,  # seed data has skills already
+            )
+            created_employees.append(row)
+        # COPY cannot upsert, so it is only used to fill freshly created tables
+        if reset and engine.dialect.name == "postgresql":
+            copy_insert(db, models.Employee, created_employees, models.Employee.id, models.Employee.email)
+        else:
+            upsert(db, models.Employee, created_employees, models.Employee.id, "emp_id")
+        print(f"  ✓ {len(created_employees)} employees seeded")
+
+        # Assign team leads
+        db.execute(update(models.Team), [
+            {"team_id": emp["team_id"], "team_lead_id": emp["id"]}
+            for emp in created_employees if emp["role"] == "team_lead"
+        ])
+        print("  ✓ Team leads assigned")
+
+        # Project titles are not unique in the schema, so match existing
+        # seed projects by title and update them by primary key instead
+        existing = dict(db.execute(
+            select(models.Project.title, models.Project.id)
+            .where(models.Project.title.in_([p["title"] for p in created_projects]))
+        ).all())
+        for project in created_projects:
+            if project["title"] in existing:
+                project["id"] = existing[project["title"]]
+        updated = [p for p in created_projects if "id" in p]
+        if updated:
+            db.execute(update(models.Project), updated)
+        new = [p for p in created_projects if "id" not in p]
+        if new:
+            bulk_insert(db, models.Project, new, models.Project.id)
+        print(f"  ✓ {len(created_projects)} projects seeded")
 
-for project in created_projects:
+    # ─────────────────────────────────────────────────────────────
+    # Generate embeddings for all employees and projects
+    # ─────────────────────────────────────────────────────────────
+    print("  ⏳ Generating embeddings (this may take a minute on first run)...")
+
+    # One batched encode, one FAISS append and one commit per kind (reindex_all)
+    # instead of a forward pass, index write and commit per row
+    failed = []
+    for kind in ("employee", "project"):
+        try:
+            reindex_all(kind, db)
+        except Exception as e:
+            db.rollback()
+            failed.append(kind)
+            print(f"    ⚠ Embedding failed for {kind}s: {e}")
+
+    if not failed:
+        print("  ✓ Embeddings generated")
+
+    db.close()
+    if deferred_indexes:
+        for ix in deferred_indexes:
+            ix.create(bind=engine)
+        print(f"  ✓ {len(deferred_indexes)} indexes built")
+    engine.dispose()
+
+    # The SQLite backup API copies a consistent snapshot including rows still
+    # in klh.db-wal, even while a running server holds klh.db open. The old
+    # tenant file's -wal/-shm are removed first so SQLite cannot replay them
+    # over the new copy, and this process's cached tenant engine is dropped.
+    master_db = os.path.join(os.path.dirname(__file__), "klh.db")
+    demo_hr_db = hr_db_path("HR001")
+    dispose_hr_db("HR001")
+    for path in (demo_hr_db, f"{demo_hr_db}-wal", f"{demo_hr_db}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    src = sqlite3.connect(master_db)
+    dst = sqlite3.connect(demo_hr_db)
     try:
-        update_project_vector(project.id, db)
-    except Exception as e:
-        print(f"    ⚠ Embedding failed for {project.title}: {e}")
-
-print("  ✓ Embeddings generated")
-
-db.close()
-
-import shutil
-master_db = os.path.join(os.path.dirname(__file__), "klh.db")
-demo_hr_db = os.path.join(os.path.dirname(__file__), "hr_HR001.db")
-shutil.copy2(master_db, demo_hr_db)
-print(f"  ✓ Copied klh.db to {os.path.basename(demo_hr_db)} for demo purposes")
-
-print("\n✅ Seeding complete!")
-print("\n📋 Login credentials:")
-print("  HR:         hr@klh.com          / hr123       (username: hr_admin | HR ID: HR001)")
-print("  Team Lead:  arjun@klh.com       / pass123     (username: arjun_lead | Team Code: ALPHA01 | Employee ID: LEAD001)")
-print("  Team Lead:  sameer@klh.com      / pass123     (username: sameer_lead | Team Code: BETA02 | Employee ID: LEAD002)")
-print("  Team Lead:  vikram@klh.com      / pass123     (username: vikram_lead | Team Code: GAMMA03 | Employee ID: LEAD003)")
-print("  Employee:   meera@klh.com       / pass123     (username: meera_dev | Employee ID: EMP001)")
-print("  Employee:   kavya@klh.com       / pass123     (username: kavya_nlp | Employee ID: EMP003)")
-print("\n🚀 Run server: uvicorn app.main:app --reload")
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    print(f"  ✓ Copied klh.db to {os.path.basename(demo_hr_db)} for demo purposes")
+
+    if failed:
+        # Rows are in place; a plain re-run embeds exactly what is missing
+        print(f"\n⚠ Seeding finished without {' or '.join(failed)} embeddings; re-run seed.py to retry.")
+    else:
+        print("\n✅ Seeding complete!")
+    print("\n📋 Login credentials:")
+    print("  HR:         hr@klh.com          / hr123       (username: hr_admin | HR ID: HR001)")
+    print("  Team Lead:  arjun@klh.com       / pass123     (username: arjun_lead | Team Code: ALPHA01 | Employee ID: LEAD001)")
+    print("  Team Lead:  sameer@klh.com      / pass123     (username: sameer_lead | Team Code: BETA02 | Employee ID: LEAD002)")
+    print("  Team Lead:  vikram@klh.com      / pass123     (username: vikram_lead | Team Code: GAMMA03 | Employee ID: LEAD003)")
+    print("  Employee:   meera@klh.com       / pass123     (username: meera_dev | Employee ID: EMP001)")
+    print("  Employee:   kavya@klh.com       / pass123     (username: kavya_nlp | Employee ID: EMP003)")
+    print("\n🚀 Run server: uvicorn app.main:app --reload")
+    if failed:
+        sys.exit(1)
+
+
+# Guarded because reindex_all may encode on spawned worker processes
+# (settings.embedding_processes), which re-import this module.
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,34 @@ class TestEmployeeEndpoints:
         assert "access_token" in data
         assert data["token_type"] == "bearer"
     
+    @pytest.mark.integration
+    @pytest.mark.parametrize("identifier", ["testuser", "EMP001"])
+    def test_login_by_username_or_emp_id(self, client, sample_employee, identifier):
+        response = client.post(
+            "/api/employee/login",
+            json={
+                "email": identifier,
+                "password": "testpass123",
+                "hr_id": "default",
+            },
+        )
+        
+        assert response.status_code == 200
+        assert "access_token" in response.json()
+    
+    @pytest.mark.integration
+    def test_login_rejects_malformed_hr_id(self, client, sample_employee):
+        response = client.post(
+            "/api/employee/login",
+            json={
+                "email": "test@example.com",
+                "password": "testpass123",
+                "hr_id": "../klh",
+            },
+        )
+        
+        assert response.status_code == 404
+    
     @pytest.mark.integration
     def test_login_invalid_credentials(self, client, sample_employee):
         response = client.post(
@@ -85,6 +113,90 @@ class TestEmployeeEndpoints:
         # Note: This may need adjustment based on actual HR database setup
         # The test may return 404 if hr_default.db doesn't exist
         assert response.status_code in [200, 404]
+    
+    @pytest.mark.integration
+    def test_update_me_defers_embedding(self, client, sample_employee, auth_headers, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "app.routes.employee.enqueue_employee_embedding",
+            lambda employee_id, bind: calls.append(employee_id),
+        )
+        response = client.put(
+            "/api/employee/me",
+            json={"skills": ["Python", "Go"]},
+            headers=auth_headers,
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["skills"] == ["python", "go"]
+        assert calls == [sample_employee.id]
+    
+    @pytest.mark.integration
+    def test_update_me_team_move_refreshes_both_teams(self, client, db, sample_employee, auth_headers, tmp_index, monkeypatch):
+        import numpy as np
+        from app import models
+        from app.services import embedding_service
+        
+        pytest.importorskip("faiss")
+        monkeypatch.setattr("app.routes.employee.enqueue_employee_embedding", lambda employee_id, bind: None)
+        path = tmp_index("employee")
+        vecs = np.random.default_rng(0).standard_normal((3, embedding_service.EMBEDDING_DIM)).astype(np.float32)
+        start = embedding_service._append_vectors(path, embedding_service._normalize(vecs))
+        old, new = models.Team(team_name="Old", team_code="OLD1"), models.Team(team_name="New", team_code="NEW1")
+        db.add_all([old, new])
+        db.flush()
+        sample_employee.team_id, sample_employee.embedding_index = old.team_id, start
+        db.add_all([
+            models.Employee(name="A", email="a@example.com", password_hash="x", team_id=old.team_id, embedding_index=start + 1),
+            models.Employee(name="B", email="b@example.com", password_hash="x", team_id=new.team_id, embedding_index=start + 2),
+        ])
+        db.flush()
+        embedding_service.refresh_team_embeddings([old.team_id, new.team_id], db)
+        db.commit()
+        
+        response = client.put("/api/employee/me", json={"team_id": new.team_id}, headers=auth_headers)
+        
+        assert response.status_code == 200
+        db.expire_all()
+        teams = [db.get(models.Team, old.team_id), db.get(models.Team, new.team_id)]
+        assert len(teams[1].members) == 2
+        for team, fresh in zip(teams, embedding_service.get_team_embeddings(teams)):
+            np.testing.assert_allclose(embedding_service.unpack_team_embedding(team.embedding), fresh, atol=1e-3)
+    
+    @pytest.mark.integration
+    def test_update_embedding_waits_for_queued_batch(self, client, sample_employee, auth_headers, monkeypatch):
+        from concurrent.futures import Future
+        
+        def enqueue(employee_id, bind):
+            future = Future()
+            future.set_result(7)
+            return future
+        
+        monkeypatch.setattr("app.routes.employee.enqueue_employee_embedding", enqueue)
+        response = client.post("/api/employee/update-embedding", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["faiss_index"] == 7
+    
+    @pytest.mark.integration
+    def test_upload_resume_rejects_non_pdf(self, client, auth_headers):
+        response = client.post(
+            "/api/employee/upload-resume",
+            headers=auth_headers,
+            files={"file": ("resume.txt", b"hello", "text/plain")},
+        )
+        
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_upload_resume_rejects_empty_file(self, client, auth_headers):
+        response = client.post(
+            "/api/employee/upload-resume",
+            headers=auth_headers,
+            files={"file": ("resume.pdf", b"", "application/pdf")},
+        )
+        
+        assert response.status_code == 400
 
 
 class TestProjectEndpoints:
@@ -98,6 +210,90 @@ class TestProjectEndpoints:
         data = response.json()
         assert isinstance(data, list)
     
+    @pytest.mark.integration
+    def test_list_projects_keyset_pages(self, client, db):
+        from app import models
+        
+        db.add_all([models.Project(title=f"P{i}", description="d") for i in range(5)])
+        db.commit()
+        
+        titles, cursor = [], 0
+        for _ in range(3):
+            response = client.get("/api/project/", params={"hr_id": "default", "limit": 2, "cursor": cursor})
+            assert response.status_code == 200
+            titles += [p["title"] for p in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+        
+        assert titles == [f"P{i}" for i in range(5)]
+        assert cursor is None
+    
+    @pytest.mark.integration
+    def test_list_projects_cache_invalidated_after_embedding(self, client, db, sample_project, tmp_index, monkeypatch):
+        import threading
+        import numpy as np
+        from app.services import embedding_service
+        
+        pytest.importorskip("faiss")
+        tmp_index("project")
+        monkeypatch.setattr(
+            embedding_service, "_encode",
+            lambda texts: embedding_service._normalize(np.ones((len(texts), embedding_service.EMBEDDING_DIM))),
+        )
+        assert client.get("/api/project/", params={"hr_id": "default"}).json()[0]["embedding_reference"] is None
+        
+        # Runs on a plain thread, as in the embedding queue worker
+        worker = threading.Thread(
+            target=embedding_service.process_embedding_batch,
+            args=("project", [sample_project.id], db.get_bind()),
+        )
+        worker.start()
+        worker.join(timeout=10)
+        
+        assert client.get("/api/project/", params={"hr_id": "default"}).json()[0]["embedding_reference"] == 0
+    
+    @pytest.mark.integration
+    def test_list_projects_cache_invalidated_on_create(self, client, sample_project, sample_hr, hr_auth_headers, monkeypatch):
+        monkeypatch.setattr("app.routes.project.enqueue_project_embedding", lambda project_id, bind: None)
+        assert len(client.get("/api/project/", params={"hr_id": "default"}).json()) == 1
+        
+        response = client.post(
+            "/api/project/",
+            json={
+                "title": "New Project",
+                "description": "Another project",
+                "required_skills": ["Go"],
+                "required_experience": 1.0,
+            },
+            headers=hr_auth_headers,
+        )
+        assert response.status_code == 201
+        
+        titles = [p["title"] for p in client.get("/api/project/", params={"hr_id": "default"}).json()]
+        assert "New Project" in titles
+        assert len(titles) == 2
+    
+    @pytest.mark.integration
+    def test_update_project_returns_new_values(self, client, sample_project, sample_hr, hr_auth_headers, monkeypatch):
+        queued = []
+        monkeypatch.setattr("app.routes.project.enqueue_project_embedding", lambda project_id, bind: queued.append(project_id))
+        
+        response = client.put(
+            f"/api/project/{sample_project.id}",
+            json={
+                "title": "Renamed",
+                "description": "Updated",
+                "required_skills": ["Rust"],
+                "required_experience": 2.0,
+            },
+            headers=hr_auth_headers,
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == sample_project.id
+        assert (data["title"], data["required_skills"]) == ("Renamed", ["rust"])
+        assert queued == [sample_project.id]
+    
     @pytest.mark.integration
     def test_get_project(self, client, sample_project):
         response = client.get(f"/api/project/{sample_project.id}")
@@ -131,3 +327,157 @@ class TestTeamEndpoints:
         response = client.get("/api/team/99999", headers=auth_headers)
         
         assert response.status_code == 404
+    
+    @pytest.mark.integration
+    def test_team_members(self, client, sample_team, sample_hr, hr_auth_headers):
+        response = client.get(f"/api/team/{sample_team.team_id}/members", headers=hr_auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [m["username"] for m in data] == ["teamlead"]
+        assert data[0]["team_id"] == sample_team.team_id
+
+
+class TestHREndpoints:
+    """Test HR API endpoints."""
+    
+    @pytest.mark.integration
+    def test_all_teams_member_counts(self, client, sample_team, sample_hr, hr_auth_headers):
+        response = client.get("/api/hr/teams", headers=hr_auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data == [
+            {
+                "team_id": sample_team.team_id,
+                "team_name": "Alpha Team",
+                "team_lead_id": sample_team.team_lead_id,
+                "member_count": 1,
+            }
+        ]
+    
+    @pytest.mark.integration
+    def test_all_teams_requires_hr(self, client, sample_team, auth_headers):
+        response = client.get("/api/hr/teams", headers=auth_headers)
+        
+        assert response.status_code == 403
+    
+    @pytest.mark.integration
+    def test_role_guard_caches_principal(self, client, db, sample_team, sample_hr, hr_auth_headers):
+        from app.auth import invalidate_principal
+        
+        assert client.get("/api/hr/teams", headers=hr_auth_headers).status_code == 200
+        db.delete(sample_hr)
+        db.commit()
+        
+        # Served from the principal cache until invalidated
+        assert client.get("/api/hr/teams", headers=hr_auth_headers).status_code == 200
+        invalidate_principal("hr@example.com")
+        assert client.get("/api/hr/teams", headers=hr_auth_headers).status_code == 404
+    
+    @pytest.mark.integration
+    def test_tenant_invalidation_drops_cached_principals(self, client, db, sample_team, sample_hr, hr_auth_headers):
+        from app.auth import invalidate_tenant_principals
+        
+        assert client.get("/api/hr/teams", headers=hr_auth_headers).status_code == 200
+        db.delete(sample_hr)
+        db.commit()
+        
+        invalidate_tenant_principals("other")
+        assert client.get("/api/hr/teams", headers=hr_auth_headers).status_code == 200
+        invalidate_tenant_principals("default")
+        assert client.get("/api/hr/teams", headers=hr_auth_headers).status_code == 404
+    
+    @pytest.mark.integration
+    def test_save_evaluation_upserts(self, client, db, sample_team, sample_project, sample_hr, hr_auth_headers):
+        from app import models
+        
+        for _ in range(2):
+            response = client.post(f"/api/hr/evaluate/{sample_project.id}", headers=hr_auth_headers)
+            assert response.status_code == 200
+            assert response.json()["saved"] == 1
+        
+        rows = db.query(models.Application).filter_by(project_id=sample_project.id).all()
+        assert len(rows) == 1
+        assert rows[0].team_id == sample_team.team_id
+    
+    @pytest.mark.integration
+    def test_project_applications_sorted_by_score(self, client, db, sample_team, sample_project, sample_hr, hr_auth_headers):
+        from app import models
+        
+        other = models.Team(team_name="Beta Team", team_code="BETA01")
+        db.add(other)
+        db.flush()
+        db.add_all([
+            models.Application(project_id=sample_project.id, team_id=sample_team.team_id, score=0.4),
+            models.Application(project_id=sample_project.id, team_id=other.team_id, score=0.9),
+        ])
+        db.commit()
+        
+        response = client.get(f"/api/hr/applications/{sample_project.id}", headers=hr_auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [a["team_id"] for a in data] == [other.team_id, sample_team.team_id]
+        assert set(data[0]) == {"id", "project_id", "team_id", "score", "created_at"}
+
+
+class TestRegistrationEndpoints:
+    """Test self-registration API endpoints."""
+    
+    @pytest.mark.integration
+    @pytest.mark.parametrize(
+        "overrides, message",
+        [
+            ({"username": "testuser"}, "Username already taken"),
+            ({"email": "test@example.com"}, "Email already registered"),
+            ({"hr_id": "EMP001"}, "Employee ID already in use"),
+        ],
+    )
+    def test_register_hr_rejects_taken_fields(self, client, sample_employee, overrides, message):
+        payload = {
+            "hr_id": "HRNEW1",
+            "username": "newhr",
+            "name": "New HR",
+            "email": "newhr@example.com",
+            "password": "secret123",
+            "password2": "secret123",
+        }
+        payload.update(overrides)
+        response = client.post("/api/register/hr", json=payload)
+        
+        assert response.status_code == 400
+        assert message in response.text
+    
+    @pytest.mark.integration
+    def test_register_teamlead_links_team_and_lead(self, client, tmp_path, monkeypatch):
+        from app import database, models
+        
+        monkeypatch.setattr(database, "_BASE_DIR", str(tmp_path))
+        monkeypatch.setattr("app.routes.register.enqueue_employee_embedding", lambda employee_id, bind: None)
+        database.get_hr_db("TLTEST")
+        try:
+            response = client.post("/api/register/teamlead", json={
+                "hr_id": "TLTEST",
+                "team_name": "Gamma",
+                "team_code": "GAMMA1",
+                "lead_id": "TL900",
+                "username": "gammalead",
+                "lead_name": "Gamma Lead",
+                "lead_email": "gamma@example.com",
+                "password": "secret123",
+                "password2": "secret123",
+            })
+            
+            assert response.status_code == 201
+            data = response.json()
+            session = database.get_hr_db("TLTEST")()
+            try:
+                team = session.query(models.Team).filter_by(team_code="GAMMA1").one()
+                assert team.team_lead_id == data["id"]
+                assert data["team_id"] == team.team_id
+            finally:
+                session.close()
+        finally:
+            database.dispose_hr_db("TLTEST")
+            database.unregister_hr_id("TLTEST")
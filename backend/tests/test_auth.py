@@ -4,7 +4,7 @@ Unit tests for authentication module.
 
 import pytest
 from datetime import datetime, timedelta, timezone
-from jose import jwt
+import jwt
 
 from app.auth import (
     hash_password,
@@ -148,3 +148,23 @@ class TestTokenDecoding:
             decode_token(token)
         
         assert exc_info.value.status_code == 401
+    
+    @pytest.mark.unit
+    def test_decode_token_is_cached_until_expiry(self):
+        from app import auth
+        
+        token = create_access_token({"sub": "cached@example.com"})
+        first = decode_token(token)
+        
+        assert token in auth._token_cache
+        assert decode_token(token) is first
+    
+    @pytest.mark.unit
+    def test_decode_failure_is_not_cached(self):
+        from fastapi import HTTPException
+        from app import auth
+        
+        with pytest.raises(HTTPException):
+            decode_token("invalid.token.here")
+        
+        assert "invalid.token.here" not in auth._token_cache
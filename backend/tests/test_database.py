@@ -0,0 +1,114 @@
+"""
+Unit tests for database helpers.
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import database
+from app.database import create_schema, hr_db_path, is_valid_hr_id
+from app import models  # noqa: F401  (registers tables on Base.metadata)
+
+
+class TestCreateSchema:
+    """Tests for schema creation on new and pre-existing databases."""
+    
+    @pytest.mark.unit
+    def test_backfills_lookup_indexes_on_existing_tables(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            # A tenant DB created before the lookup columns were indexed
+            conn.execute(text(
+                "CREATE TABLE employees (id INTEGER PRIMARY KEY, emp_id VARCHAR, "
+                "username VARCHAR, name VARCHAR NOT NULL, email VARCHAR NOT NULL, "
+                "password_hash VARCHAR NOT NULL, role VARCHAR, team_id INTEGER)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE teams (team_id INTEGER PRIMARY KEY, team_name VARCHAR NOT NULL, "
+                "team_code VARCHAR, team_lead_id INTEGER)"
+            ))
+        
+        create_schema(engine)
+        
+        inspector = inspect(engine)
+        employee_indexes = {i["name"]: i for i in inspector.get_indexes("employees")}
+        team_indexes = {i["name"]: i for i in inspector.get_indexes("teams")}
+        for name in ("ix_employees_username", "ix_employees_email", "ix_employees_emp_id"):
+            assert employee_indexes[name]["unique"]
+        assert team_indexes["ix_teams_team_code"]["unique"]
+        # Nullable columns added to the models later are backfilled too
+        assert "embedding" in {c["name"] for c in inspector.get_columns("teams")}
+    
+    @pytest.mark.unit
+    def test_is_idempotent(self):
+        engine = create_engine("sqlite://")
+        create_schema(engine)
+        create_schema(engine)
+        
+        assert "applications" in inspect(engine).get_table_names()
+
+
+class TestHRIds:
+    """Tests for tenant ID validation."""
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("hr_id", ["HR001", "acme_hr", "team-7"])
+    def test_valid_hr_ids(self, hr_id):
+        assert is_valid_hr_id(hr_id)
+        assert hr_db_path(hr_id).endswith(f"hr_{hr_id}.db")
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("hr_id", ["", "../klh", "a/b", "x" * 65, "hr 1"])
+    def test_invalid_hr_ids(self, hr_id):
+        assert not is_valid_hr_id(hr_id)
+        with pytest.raises(ValueError):
+            hr_db_path(hr_id)
+    
+    @pytest.mark.unit
+    def test_admin_tools_reject_path_traversal(self):
+        from app.admin_tools import backup_hr_db, delete_hr_db, get_hr_db_size
+        
+        for tool in (delete_hr_db, get_hr_db_size):
+            with pytest.raises(ValueError):
+                tool("../klh")
+        with pytest.raises(ValueError):
+            backup_hr_db("../klh", "/tmp")
+    
+    @pytest.mark.unit
+    def test_hr_exists_uses_known_set_then_filesystem(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(database, "_BASE_DIR", str(tmp_path))
+        monkeypatch.setattr(database, "_EXISTING_HR", set())
+        stats = []
+        real_exists = database.os.path.exists
+        monkeypatch.setattr(database.os.path, "exists", lambda p: stats.append(p) or real_exists(p))
+        
+        assert not database.hr_exists("HR404")
+        assert not database.hr_exists("../etc")
+        (tmp_path / "hr_HR777.db").touch()
+        assert database.hr_exists("HR777")
+        assert database.hr_exists("HR777")
+        database.register_hr_id("HR888")
+        assert database.hr_exists("HR888")
+        
+        # One stat per miss; known tenants and malformed IDs never touch the disk
+        assert len(stats) == 2
+
+
+class TestHREngines:
+    """Tests for cached per-tenant engines."""
+    
+    @pytest.mark.unit
+    def test_tenant_connections_use_wal(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(database, "_BASE_DIR", str(tmp_path))
+        try:
+            session = database.get_hr_db("waltest")()
+            try:
+                assert session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                # NORMAL == 1
+                assert session.execute(text("PRAGMA synchronous")).scalar() == 1
+            finally:
+                session.close()
+            assert (tmp_path / "hr_waltest.db").exists()
+        finally:
+            database.dispose_hr_db("waltest")
+            database.unregister_hr_id("waltest")
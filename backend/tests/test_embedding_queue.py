@@ -0,0 +1,223 @@
+"""
+Unit tests for batched embedding updates.
+"""
+
+import numpy as np
+import pytest
+
+from app.services import embedding_service
+from app.services.embedding_queue import EmbeddingQueue
+
+
+class _FakeModel:
+    """Stands in for the sentence-transformer; records batch sizes."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        self.calls.append(len(texts))
+        rng = np.random.default_rng(len(texts))
+        vecs = rng.standard_normal((len(texts), embedding_service.EMBEDDING_DIM)).astype(np.float32)
+        if normalize_embeddings:
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        return vecs
+
+
+class TestEmbeddingQueue:
+    """Tests for the batching queue."""
+    
+    @pytest.mark.unit
+    def test_groups_and_dedups_by_kind_and_bind(self):
+        calls = []
+        q = EmbeddingQueue(lambda kind, ids, bind: calls.append((kind, ids, bind)), max_wait=0.5)
+        for kind, obj_id, bind in [
+            ("employee", 1, "a"), ("employee", 2, "a"), ("employee", 1, "a"),
+            ("project", 7, "a"), ("employee", 3, "b"),
+        ]:
+            q.enqueue(kind, obj_id, bind)
+        q.join()
+        q.stop(timeout=1)
+        
+        assert sorted(calls) == [
+            ("employee", [1, 2], "a"),
+            ("employee", [3], "b"),
+            ("project", [7], "a"),
+        ]
+    
+    @pytest.mark.unit
+    def test_failed_batch_does_not_stop_worker(self):
+        seen = []
+        
+        def process(kind, ids, bind):
+            seen.extend(ids)
+            if ids == [1]:
+                raise RuntimeError("boom")
+        
+        q = EmbeddingQueue(process, max_wait=0)
+        q.enqueue("employee", 1, "a")
+        q.join()
+        q.enqueue("employee", 2, "a")
+        q.join()
+        q.stop(timeout=1)
+        
+        assert seen == [1, 2]
+    
+    @pytest.mark.unit
+    def test_futures_resolve_with_batch_results(self):
+        def process(kind, ids, bind):
+            if kind == "project":
+                raise RuntimeError("boom")
+            return {obj_id: obj_id * 10 for obj_id in ids if obj_id != 2}
+        
+        q = EmbeddingQueue(process, max_wait=0.5)
+        first = q.enqueue("employee", 1, "a")
+        duplicate = q.enqueue("employee", 1, "a")
+        missing = q.enqueue("employee", 2, "a")
+        failed = q.enqueue("project", 3, "a")
+        q.join()
+        q.stop(timeout=1)
+        
+        assert first.result(timeout=1) == duplicate.result(timeout=1) == 10
+        assert missing.result(timeout=1) is None
+        with pytest.raises(RuntimeError):
+            failed.result(timeout=1)
+
+
+class TestUpdateVectorsBatch:
+    """Tests for the single-pass batch embedding update."""
+    
+    @pytest.mark.unit
+    def test_assigns_consecutive_rows_in_one_encode(self, db, tmp_index, monkeypatch):
+        from app import models
+        
+        fake = _FakeModel()
+        monkeypatch.setattr(embedding_service, "_get_model", lambda: fake)
+        tmp_index("employee")
+        employees = [
+            models.Employee(name=f"E{i}", email=f"e{i}@example.com", password_hash="x", role="employee")
+            for i in range(3)
+        ]
+        db.add_all(employees)
+        db.commit()
+        
+        assigned = embedding_service.update_vectors_batch("employee", [e.id for e in employees], db)
+        
+        assert fake.calls == [3]
+        assert sorted(assigned.values()) == [0, 1, 2]
+        assert [e.embedding_index for e in employees] == [assigned[e.id] for e in employees]
+    
+    @pytest.mark.unit
+    def test_skips_rows_with_unchanged_text(self, db, tmp_index, monkeypatch):
+        from app import models
+        
+        fake = _FakeModel()
+        monkeypatch.setattr(embedding_service, "_get_model", lambda: fake)
+        tmp_index("employee")
+        employees = [
+            models.Employee(name=f"E{i}", email=f"e{i}@example.com", password_hash="x", skills=["Go"])
+            for i in range(3)
+        ]
+        db.add_all(employees)
+        db.commit()
+        ids = [e.id for e in employees]
+        first = embedding_service.update_vectors_batch("employee", ids, db)
+        
+        assert embedding_service.update_vectors_batch("employee", ids, db) == first
+        assert fake.calls == [3]
+        
+        employees[1].skills = ["Rust"]
+        db.commit()
+        second = embedding_service.update_vectors_batch("employee", ids, db)
+        
+        assert fake.calls == [3, 1]
+        assert second == {**first, ids[1]: 3}
+    
+    @pytest.mark.unit
+    def test_team_move_with_unchanged_text_refreshes_team(self, db, tmp_index, monkeypatch):
+        from app import models
+        
+        fake = _FakeModel()
+        monkeypatch.setattr(embedding_service, "_get_model", lambda: fake)
+        tmp_index("employee")
+        team = models.Team(team_name="T", team_code="T1")
+        member = models.Employee(name="E", email="e@example.com", password_hash="x")
+        db.add_all([team, member])
+        db.commit()
+        embedding_service.update_vectors_batch("employee", [member.id], db)
+        assert team.embedding is None
+        
+        member.team_id = team.team_id
+        db.commit()
+        embedding_service.update_vectors_batch("employee", [member.id], db)
+        
+        assert fake.calls == [1]
+        assert team.embedding is not None
+    
+    @pytest.mark.unit
+    def test_reindex_all_commits_once(self, db, tmp_index, monkeypatch):
+        from sqlalchemy import event
+        from app import models
+        
+        faiss = pytest.importorskip("faiss")
+        fake = _FakeModel()
+        monkeypatch.setattr(embedding_service, "_get_model", lambda: fake)
+        path = tmp_index("project")
+        db.add_all([models.Project(title=f"P{i}", description="d") for i in range(5)])
+        db.commit()
+        commits = []
+        event.listen(db, "after_commit", lambda session: commits.append(1))
+        
+        assert embedding_service.reindex_all("project", db) == 5
+        
+        assert fake.calls == [5]
+        assert len(commits) == 1
+        assert sorted(p.embedding_reference for p in db.query(models.Project)) == [0, 1, 2, 3, 4]
+        assert faiss.read_index(path).ntotal == 5
+    
+    @pytest.mark.unit
+    def test_refreshes_embedding_of_affected_teams(self, db, tmp_index, monkeypatch):
+        from app import models
+        
+        monkeypatch.setattr(embedding_service, "_get_model", lambda: _FakeModel())
+        monkeypatch.setattr(embedding_service.settings, "faiss_storage", "fp32")
+        tmp_index("employee")
+        team = models.Team(team_name="T", team_code="T1")
+        db.add(team)
+        db.flush()
+        member = models.Employee(name="E", email="e@example.com", password_hash="x", team_id=team.team_id)
+        db.add(member)
+        db.commit()
+        
+        embedding_service.update_vectors_batch("employee", [member.id], db)
+        
+        blob = db.get(models.Team, team.team_id).embedding
+        assert len(blob) == embedding_service.EMBEDDING_DIM * 2  # float16
+        stored = embedding_service.unpack_team_embedding(blob)
+        expected = embedding_service.get_employee_vector(member.embedding_index).ravel()
+        np.testing.assert_allclose(stored, expected, atol=1e-3)
+
+
+class TestUpdateVectorByObj:
+    """Tests for embedding an already-loaded row."""
+    
+    @pytest.mark.unit
+    def test_by_obj_leaves_commit_to_caller(self, db, tmp_index, monkeypatch):
+        from sqlalchemy import event
+        from app import models
+        
+        pytest.importorskip("faiss")
+        monkeypatch.setattr(embedding_service, "_get_model", lambda: _FakeModel())
+        tmp_index("project")
+        project = models.Project(title="P", description="d")
+        db.add(project)
+        db.commit()
+        commits = []
+        event.listen(db, "after_commit", lambda session: commits.append(1))
+        
+        assert embedding_service.update_project_vector_by_obj(project, db) == 0
+        assert commits == []
+        assert embedding_service.update_project_vector(project.id, db) == 1
+        
+        assert commits == [1]
+        assert project.embedding_reference == 1
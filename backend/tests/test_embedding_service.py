@@ -0,0 +1,381 @@
+"""
+Unit tests for embedding service index management.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from app.services import embedding_service
+from app.services.embedding_service import EMBEDDING_DIM, _DoubleBufferedIndex
+
+
+def _unit_rows(n, seed=0):
+    vecs = np.random.default_rng(seed).standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@pytest.fixture(autouse=True)
+def exact_storage(monkeypatch):
+    """Index-mechanics tests compare vectors exactly; fp16 storage is tested separately."""
+    monkeypatch.setattr(embedding_service.settings, "faiss_storage", "fp32")
+
+
+class TestLoadModel:
+    """Tests for encoder backend selection."""
+    
+    @pytest.mark.unit
+    def test_onnx_backend_falls_back_to_torch(self, monkeypatch):
+        calls = []
+        
+        def fake_model(name, backend="torch", model_kwargs=None):
+            calls.append(backend)
+            if backend == "onnx":
+                raise ImportError("onnxruntime not installed")
+            return "torch-model"
+        
+        monkeypatch.setattr(embedding_service, "SentenceTransformer", fake_model)
+        monkeypatch.setattr(embedding_service.settings, "embedding_backend", "onnx")
+        
+        assert embedding_service._load_model() == "torch-model"
+        assert calls == ["onnx", "torch"]
+    
+    @pytest.mark.unit
+    def test_model_is_loaded_once_with_configured_seq_length(self, monkeypatch):
+        class Model:
+            max_seq_length = 256
+        
+        loads = []
+        monkeypatch.setattr(embedding_service, "_model", None)
+        monkeypatch.setattr(embedding_service, "_configure_threads", lambda: None)
+        monkeypatch.setattr(embedding_service, "_load_model", lambda: loads.append(1) or Model())
+        monkeypatch.setattr(embedding_service.settings, "embedding_max_seq_length", 128)
+        
+        model = embedding_service._get_model()
+        
+        assert embedding_service._get_model() is model
+        assert loads == [1]
+        assert model.max_seq_length == 128
+    
+    @pytest.mark.unit
+    def test_compute_threads_split_across_workers(self, monkeypatch):
+        monkeypatch.setattr(embedding_service.os, "cpu_count", lambda: 8)
+        monkeypatch.setenv("WEB_CONCURRENCY", "2")
+        assert embedding_service.compute_threads() == 4
+        
+        monkeypatch.setenv("WEB_CONCURRENCY", "16")
+        assert embedding_service.compute_threads() == 1
+        
+        monkeypatch.setattr(embedding_service.settings, "compute_threads", 3)
+        assert embedding_service.compute_threads() == 3
+    
+    @pytest.mark.unit
+    def test_parallel_encode_keeps_input_order(self, monkeypatch):
+        class InlinePool:
+            def __init__(self, max_workers, mp_context, initializer):
+                self.workers = max_workers
+            
+            def __enter__(self):
+                pools.append(self)
+                return self
+            
+            def __exit__(self, *exc):
+                return False
+            
+            def map(self, fn, chunks):
+                return map(fn, chunks)
+        
+        pools = []
+        monkeypatch.setattr(embedding_service, "ProcessPoolExecutor", InlinePool)
+        monkeypatch.setattr(embedding_service, "ENCODE_BATCH_SIZE", 2)
+        monkeypatch.setattr(embedding_service, "_encode", lambda texts: np.array([[float(t)] for t in texts]))
+        texts = [str(i) for i in range(7)]
+        
+        assert embedding_service._encode_parallel(texts, 3).ravel().tolist() == list(range(7))
+        assert [p.workers for p in pools] == [3]
+        
+        # Too few texts to pay for the worker start-up: encoded in-process
+        embedding_service._encode_parallel(texts[:5], 3)
+        assert len(pools) == 1
+
+
+class TestNormalize:
+    """Tests for L2 normalisation."""
+    
+    @pytest.mark.unit
+    def test_scales_float32_rows_in_place(self):
+        vecs = np.random.default_rng(0).standard_normal((4, EMBEDDING_DIM)).astype(np.float32)
+        expected = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+        
+        out = embedding_service._normalize(vecs)
+        
+        assert out is vecs
+        np.testing.assert_allclose(out, expected, rtol=1e-5)
+    
+    @pytest.mark.unit
+    def test_zero_and_1d_inputs(self):
+        out = embedding_service._normalize(np.zeros(EMBEDDING_DIM))
+        
+        assert out.shape == (1, EMBEDDING_DIM)
+        assert out.dtype == np.float32
+        assert not out.any()
+
+
+class TestSimilarity:
+    """Tests for the vector similarity helpers."""
+    
+    @pytest.mark.unit
+    def test_cosine_similarity_matches_unit_dot(self):
+        a, b = _unit_rows(2)
+        
+        assert embedding_service.compute_cosine_similarity(3 * a, b.reshape(1, -1)) == pytest.approx(
+            embedding_service.dot_unit(a, b), abs=1e-6
+        )
+        assert embedding_service.compute_cosine_similarity(a, np.zeros(EMBEDDING_DIM)) == 0.0
+        np.testing.assert_array_equal(a, _unit_rows(2)[0])  # inputs untouched
+
+
+class TestDoubleBufferedIndex:
+    """Tests for the read/write double-buffered FAISS index."""
+    
+    @pytest.mark.unit
+    def test_add_keeps_both_buffers_in_sync(self):
+        store = _DoubleBufferedIndex(faiss.IndexFlatIP(EMBEDDING_DIM))
+        
+        assert store.add(_unit_rows(3)) == 0
+        assert store.add(_unit_rows(2, seed=1)) == 3
+        
+        for buf in store._buffers:
+            assert buf.ntotal == 5
+        np.testing.assert_array_equal(
+            store._buffers[0].reconstruct_n(0, 5), store._buffers[1].reconstruct_n(0, 5)
+        )
+    
+    @pytest.mark.unit
+    def test_second_copy_is_made_on_first_add(self):
+        store = _DoubleBufferedIndex(faiss.IndexFlatIP(EMBEDDING_DIM))
+        
+        assert store._buffers[1] is None
+        with store.reading() as index:
+            assert index.ntotal == 0
+        
+        store.add(_unit_rows(1))
+        assert all(buf.ntotal == 1 for buf in store._buffers)
+    
+    @pytest.mark.unit
+    def test_reader_copy_is_not_mutated_while_held(self):
+        store = _DoubleBufferedIndex(faiss.IndexFlatIP(EMBEDDING_DIM))
+        store.add(_unit_rows(1))
+        
+        with store.reading() as index:
+            writer = threading.Thread(target=store.add, args=(_unit_rows(1, seed=2),))
+            writer.start()
+            writer.join(timeout=0.2)
+            # The writer has swapped but must wait for us before replaying
+            assert writer.is_alive()
+            assert index.ntotal == 1
+            assert store.active.ntotal == 2
+        writer.join(timeout=1)
+        
+        assert not writer.is_alive()
+        assert all(buf.ntotal == 2 for buf in store._buffers)
+
+
+class TestVectorLookup:
+    """Tests for appending and reading vectors by row."""
+    
+    @pytest.mark.unit
+    def test_append_then_reconstruct(self, tmp_path):
+        path = str(tmp_path / "test.index")
+        vecs = _unit_rows(4)
+        
+        assert embedding_service._append_vectors(path, vecs[:2]) == 0
+        assert embedding_service._append_vectors(path, vecs[2:]) == 2
+        
+        np.testing.assert_allclose(embedding_service._reconstruct(path, 3), vecs[3:4])
+        assert embedding_service._reconstruct(path, 4) is None
+        assert faiss.read_index(path).ntotal == 4
+    
+    @pytest.mark.unit
+    def test_reopens_persisted_index_from_mmap(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "test.index")
+        vecs = _unit_rows(3)
+        embedding_service._append_vectors(path, vecs[:2])
+        # Simulate a fresh worker process
+        monkeypatch.setattr(embedding_service, "_index_stores", {})
+        
+        np.testing.assert_allclose(embedding_service._reconstruct(path, 1), vecs[1:2])
+        assert embedding_service._append_vectors(path, vecs[2:]) == 2
+        
+        store = embedding_service._get_index_store(path)
+        assert store._mapped == [False, False]
+        assert all(buf.ntotal == 3 for buf in store._buffers)
+        assert faiss.read_index(path).ntotal == 3
+        assert not (tmp_path / "test.index.tmp").exists()
+    
+    @pytest.mark.unit
+    def test_reloads_index_rewritten_by_another_process(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "test.index")
+        vecs = _unit_rows(3)
+        embedding_service._append_vectors(path, vecs[:1])
+        assert embedding_service._reconstruct(path, 1) is None
+        
+        # Another worker appends two rows and saves
+        other = faiss.IndexFlatIP(EMBEDDING_DIM)
+        other.add(vecs)
+        faiss.write_index(other, path)
+        os.utime(path, ns=(0, embedding_service._index_mtimes[path] + 1))
+        
+        # Within the check interval the cached copy is served as-is
+        assert embedding_service._reconstruct(path, 1) is None
+        monkeypatch.setattr(embedding_service, "INDEX_RELOAD_CHECK_SECONDS", 0)
+        np.testing.assert_allclose(embedding_service._reconstruct(path, 2), vecs[2:3])
+        assert embedding_service._append_vectors(path, _unit_rows(1, seed=3)) == 3
+    
+    @pytest.mark.unit
+    def test_concurrent_processes_append_distinct_rows(self, tmp_path):
+        import multiprocessing
+        
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("needs fork")
+        path = str(tmp_path / "test.index")
+        embedding_service._append_vectors(path, _unit_rows(1))
+        
+        def append_many(seed):
+            for i in range(30):
+                embedding_service._append_vectors(path, _unit_rows(1, seed=seed * 100 + i))
+        
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=append_many, args=(seed,)) for seed in (1, 2)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(timeout=30)
+        
+        assert [w.exitcode for w in workers] == [0, 0]
+        assert faiss.read_index(path).ntotal == 61
+        matrix = np.fromfile(embedding_service._matrix_path(path), dtype=np.float32)
+        assert matrix.size == 61 * EMBEDDING_DIM
+    
+    @pytest.mark.unit
+    def test_gathers_rows_from_saved_matrix(self, tmp_path):
+        path = str(tmp_path / "test.index")
+        vecs = _unit_rows(4)
+        embedding_service._append_vectors(path, vecs[:3])
+        embedding_service._append_vectors(path, vecs[3:])
+        
+        matrix = embedding_service._get_matrix(path)
+        assert isinstance(matrix, np.memmap)
+        np.testing.assert_allclose(matrix, vecs)
+        
+        gathered, present = embedding_service._gather_rows(path, np.array([3, 0, 7]))
+        assert present.tolist() == [True, True, False]
+        np.testing.assert_allclose(gathered, vecs[[3, 0]])
+    
+    @pytest.mark.unit
+    def test_matrix_is_appended_and_rewritten_only_when_out_of_step(self, tmp_path):
+        path = str(tmp_path / "test.index")
+        matrix_path = embedding_service._matrix_path(path)
+        vecs = _unit_rows(5)
+        embedding_service._append_vectors(path, vecs[:2])
+        inode = os.stat(matrix_path).st_ino
+        
+        embedding_service._append_vectors(path, vecs[2:3])
+        assert os.stat(matrix_path).st_ino == inode  # appended in place
+        
+        # A torn append leaves the file out of step: the next save rewrites it
+        with open(matrix_path, "r+b") as f:
+            f.truncate(EMBEDDING_DIM * 4 + 10)
+        embedding_service._append_vectors(path, vecs[3:])
+        
+        assert os.stat(matrix_path).st_ino != inode
+        np.testing.assert_allclose(np.fromfile(matrix_path, dtype=np.float32).reshape(-1, EMBEDDING_DIM), vecs)
+    
+    @pytest.mark.unit
+    def test_gather_falls_back_to_index_without_matrix(self, tmp_path):
+        path = str(tmp_path / "test.index")
+        vecs = _unit_rows(2)
+        embedding_service._append_vectors(path, vecs)
+        os.remove(f"{path}.f32")
+        
+        assert embedding_service._get_matrix(path) is None
+        gathered, _ = embedding_service._gather_rows(path, np.array([1]))
+        np.testing.assert_allclose(gathered, vecs[1:])
+    
+    @pytest.mark.unit
+    def test_fp16_storage_halves_rows_within_tolerance(self, tmp_path, monkeypatch):
+        vecs = _unit_rows(64)
+        sizes = {}
+        for storage in ("fp32", "fp16"):
+            monkeypatch.setattr(embedding_service.settings, "faiss_storage", storage)
+            path = str(tmp_path / f"{storage}.index")
+            embedding_service._append_vectors(path, vecs)
+            sizes[storage] = os.path.getsize(path)
+        
+        index = embedding_service._get_index_store(path).active
+        assert isinstance(index, faiss.IndexScalarQuantizer)
+        assert sizes["fp16"] < 0.6 * sizes["fp32"]
+        np.testing.assert_allclose(embedding_service._reconstruct(path, 5), vecs[5:6], atol=1e-3)
+        hits = embedding_service.search_vectors(path, vecs[9], list(range(64)), k=1)
+        assert hits[0][0] == 9 and hits[0][1] == pytest.approx(1.0, abs=1e-3)
+
+
+class TestSearchVectors:
+    """Tests for restricted top-k similarity search."""
+    
+    @pytest.mark.unit
+    def test_exact_search_respects_allowed_rows(self, tmp_path):
+        path = str(tmp_path / "proj.index")
+        vecs = _unit_rows(20)
+        embedding_service._append_vectors(path, vecs)
+        
+        hits = embedding_service.search_vectors(path, vecs[4], rows=[1, 4, 9, 99], k=2)
+        
+        assert hits[0][0] == 4
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert {row for row, _ in hits} <= {1, 4, 9}
+    
+    @pytest.mark.unit
+    def test_ann_path_finds_exact_match(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(embedding_service.settings, "faiss_ann_threshold", 500)
+        monkeypatch.setattr(embedding_service.settings, "faiss_ivf_nlist", 16)
+        monkeypatch.setattr(embedding_service.settings, "faiss_pq_nbits", 4)
+        path = str(tmp_path / "proj.index")
+        vecs = _unit_rows(1000)
+        embedding_service._append_vectors(path, vecs)
+        rows = list(range(0, 1000, 2))
+        
+        hits = embedding_service.search_vectors(path, vecs[42], rows=rows, k=5)
+        
+        assert path in embedding_service._ann_snapshots
+        assert hits[0][0] == 42
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert all(row % 2 == 0 for row, _ in hits)
+    
+    @pytest.mark.unit
+    def test_hnsw_ann_path_finds_exact_match(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(embedding_service.settings, "faiss_ann_threshold", 500)
+        monkeypatch.setattr(embedding_service.settings, "faiss_ann_kind", "hnsw")
+        path = str(tmp_path / "proj.index")
+        vecs = _unit_rows(1000, seed=5)
+        embedding_service._append_vectors(path, vecs)
+        rows = list(range(1, 1000, 2))
+        
+        hits = embedding_service.search_vectors(path, vecs[77], rows=rows, k=5)
+        
+        assert isinstance(embedding_service._ann_snapshots[path].index, faiss.IndexHNSW)
+        assert hits[0][0] == 77
+        assert all(row % 2 == 1 for row, _ in hits)
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("k", [0, 1, 3, 5, 8])
+    def test_top_k_matches_full_sort(self, k):
+        scores = np.array([0.1, 0.9, 0.5, 0.9, -0.2], dtype=np.float32)
+        
+        top = embedding_service._top_k(scores, k)
+        
+        assert top.tolist() == np.argsort(-scores, kind="stable")[:k].tolist()
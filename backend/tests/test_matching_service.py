@@ -0,0 +1,160 @@
+"""
+Unit tests for the hybrid team/project matching service.
+"""
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from app import models
+from app.services import embedding_service
+from app.services.embedding_service import EMBEDDING_DIM
+from app.services.matching_service import (
+    _skill_coverage,
+    _skill_coverage_fast,
+    _team_balance,
+    _team_features,
+    calculate_team_score,
+    rank_teams,
+)
+
+
+def _unit_rows(n, seed=0):
+    vecs = np.random.default_rng(seed).standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def indexed_teams(db, tmp_path, monkeypatch):
+    """Three teams (one without embeddings) and a project, backed by temp indices."""
+    monkeypatch.setattr(embedding_service, "EMPLOYEE_INDEX_PATH", str(tmp_path / "emp.index"))
+    monkeypatch.setattr(embedding_service, "PROJECT_INDEX_PATH", str(tmp_path / "proj.index"))
+    emp_rows = embedding_service._append_vectors(embedding_service.EMPLOYEE_INDEX_PATH, _unit_rows(5))
+    proj_row = embedding_service._append_vectors(embedding_service.PROJECT_INDEX_PATH, _unit_rows(1, seed=9))
+
+    project = models.Project(
+        title="P", description="d", required_skills=["Python", "Go"],
+        required_experience=2.0, embedding_reference=proj_row,
+    )
+    teams = [models.Team(team_name=f"T{i}", team_code=f"T{i}") for i in range(3)]
+    db.add_all([project, *teams])
+    db.flush()
+
+    layout = {0: [0, 1, 2], 1: [3, 4], 2: [None]}
+    for t, rows in layout.items():
+        for j, row in enumerate(rows):
+            member = models.Employee(
+                name=f"E{t}{j}", email=f"e{t}{j}@example.com", password_hash="x",
+                team_id=teams[t].team_id, skills=["Python"] if j else ["Go"],
+                experience=float(j + 1),
+                embedding_index=None if row is None else emp_rows + row,
+            )
+            db.add(member)
+            db.flush()
+            if j == 0:
+                teams[t].team_lead_id = member.id
+    db.commit()
+    return project, teams
+
+
+class TestTeamFeatures:
+    """Tests for the precomputed per-team scoring inputs."""
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("skill_lists", [[], [[]], [["Python", "python", "Go"], ["SQL"]], [["Rust"], None]])
+    def test_agrees_with_reference_helpers(self, skill_lists):
+        members = [models.Employee(skills=skills, experience=float(i)) for i, skills in enumerate(skill_lists)]
+        required = ["python", "sql", "kotlin"]
+        team_skills = [s for m in members for s in (m.skills or [])]
+        
+        features = _team_features(members)
+        
+        assert features.balance == _team_balance(members)
+        assert _skill_coverage_fast(frozenset(required), features.skills) == _skill_coverage(required, team_skills)
+        assert _skill_coverage_fast(frozenset(), features.skills) == 1.0
+        assert features.avg_experience == (sum(range(len(members))) / len(members) if members else 0.0)
+
+
+class TestSkillNormalization:
+    """Tests for lowercasing skills at write time."""
+    
+    @pytest.mark.unit
+    def test_skills_are_stored_lowercased(self, db):
+        employee = models.Employee(name="E", email="e@example.com", password_hash="x", skills=[" Python", "GO "])
+        project = models.Project(title="P", description="d", required_skills=["FastAPI"])
+        db.add_all([employee, project])
+        db.commit()
+        
+        employee.skills = employee.skills + ["Rust"]
+        db.commit()
+        db.expire_all()
+        
+        assert employee.skills == ["python", "go", "rust"]
+        assert project.required_skills == ["fastapi"]
+        assert models.normalize_skills(None) is None
+
+
+class TestRankTeams:
+    """Tests for batched team ranking."""
+    
+    @pytest.mark.unit
+    def test_matches_per_team_scoring(self, db, indexed_teams):
+        project, teams = indexed_teams
+        
+        ranked = rank_teams(project.id, db)
+        
+        assert [r["final_score"] for r in ranked] == sorted((r["final_score"] for r in ranked), reverse=True)
+        for result in ranked:
+            expected = calculate_team_score(result["team_id"], project.id, db)
+            for key, value in expected.items():
+                assert result[key] == pytest.approx(value, abs=1e-4)
+        no_embeddings = next(r for r in ranked if r["team_id"] == teams[2].team_id)
+        assert no_embeddings["embedding_similarity"] == 0.0
+    
+    @pytest.mark.unit
+    def test_uses_stored_team_embeddings(self, db, indexed_teams):
+        project, teams = indexed_teams
+        before = {r["team_id"]: r["embedding_similarity"] for r in rank_teams(project.id, db)}
+        
+        embedding_service.refresh_team_embeddings([t.team_id for t in teams], db)
+        db.commit()
+        
+        assert teams[0].embedding is not None
+        assert teams[2].embedding is None  # no indexed members
+        after = {r["team_id"]: r["embedding_similarity"] for r in rank_teams(project.id, db)}
+        assert after == pytest.approx(before, abs=1e-4)
+        
+        # A stored vector is read as-is rather than rebuilt from the members
+        teams[1].embedding = embedding_service.get_project_vector(project.embedding_reference).tobytes()
+        db.commit()
+        ranked = {r["team_id"]: r for r in rank_teams(project.id, db)}
+        assert ranked[teams[1].team_id]["embedding_similarity"] == pytest.approx(1.0, abs=1e-4)
+    
+    @pytest.mark.unit
+    def test_single_team_score_loads_members_eagerly(self, db, indexed_teams):
+        from sqlalchemy import event
+        
+        project, teams = indexed_teams
+        team_id, project_id = teams[0].team_id, project.id
+        db.expunge_all()
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        try:
+            calculate_team_score(team_id, project_id, db)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+        
+        # team, its members (SELECT ... IN) and the project
+        assert len(statements) == 3
+    
+    @pytest.mark.unit
+    def test_limit_keeps_best_teams_in_order(self, db, indexed_teams):
+        project, _ = indexed_teams
+        
+        assert rank_teams(project.id, db, limit=2) == rank_teams(project.id, db)[:2]
+    
+    @pytest.mark.unit
+    def test_unknown_project_ranks_nothing(self, db, indexed_teams):
+        assert rank_teams(99999, db) == []
@@ -0,0 +1,49 @@
+"""
+Unit tests for resume skill extraction.
+"""
+
+import pytest
+
+pytest.importorskip("spacy")
+
+from app.services.skill_extractor import extract_skills, load_skill_vocabulary
+
+
+class TestSkillVocabulary:
+    """Tests for the bundled skill vocabulary."""
+    
+    @pytest.mark.unit
+    def test_vocabulary_has_no_case_duplicates(self):
+        skills = load_skill_vocabulary()
+        lowered = [s.lower() for s in skills]
+        
+        assert len(lowered) == len(set(lowered))
+        assert "Python" in skills
+
+
+class TestExtractSkills:
+    """Tests for PhraseMatcher-based skill extraction."""
+    
+    @pytest.mark.unit
+    def test_extracts_canonical_spelling(self):
+        skills = extract_skills("Worked with python, fastapi and POSTGRESQL daily.")
+        
+        assert skills == ["Python", "FastAPI", "PostgreSQL"]
+    
+    @pytest.mark.unit
+    def test_matches_punctuated_skills(self):
+        skills = extract_skills("Stack: C++, Node.js, CI/CD pipelines")
+        
+        assert {"C++", "Node.js", "CI/CD"} <= set(skills)
+    
+    @pytest.mark.unit
+    def test_short_skills_are_case_sensitive(self):
+        assert "R" not in extract_skills("r and c are letters")
+        assert "R" in extract_skills("Statistics in R")
+    
+    @pytest.mark.unit
+    def test_deduplicates_and_respects_limit(self):
+        text = "Python python PYTHON Docker Kubernetes Terraform"
+        
+        assert extract_skills(text) == ["Python", "Docker", "Kubernetes", "Terraform"]
+        assert extract_skills(text, limit=2) == ["Python", "Docker"]